@@ -1,6 +1,15 @@
 from .game import Game
 from .board import Board
 from .piece import Piece
-from .ai_player import AIPlayer
+from .state import GameState
 
-__all__ = ['Game', 'Board', 'Piece', 'AIPlayer']
\ No newline at end of file
+__all__ = ['Game', 'Board', 'Piece', 'GameState', 'AIPlayer']
+
+
+def __getattr__(name):
+    # Imported on first use: the AI modules are also run as scripts
+    # (python -m quarto.book), which must not be imported by the package first
+    if name == 'AIPlayer':
+        from .ai_player import AIPlayer
+        return AIPlayer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
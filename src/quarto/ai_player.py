@@ -1,485 +1,547 @@
 import random
-from copy import deepcopy
-import math
-from time import time
-import numpy as np
-import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor
 import os
 import logging
-
-class Node:
-    def __init__(self, game_state, parent=None):
-        self.game_state = game_state
-        self.parent = parent
-        self.children = []
-        self.wins = 0
-        self.visits = 0
-        self.untried_moves = self._get_possible_moves()
-        
-    def _get_possible_moves(self):
-        moves = []
-        for row in range(4):
-            for col in range(4):
-                try:
-                    game_copy = deepcopy(self.game_state)
-                    game_copy.place_selected_piece(row, col)
-                    moves.append((row, col))
-                except ValueError:
-                    continue
-        return moves
-
-class Individual:
-    def __init__(self, strategy_genes=None):
-        if strategy_genes is None:
-            # Initialize random genes for piece selection and placement
-            self.strategy_genes = np.random.random(32)  # 16 for piece selection, 16 for placement
-        else:
-            self.strategy_genes = strategy_genes
-        self.fitness = 0
-
-    def mutate(self, mutation_rate=0.1):
-        """Mutate the genes with given probability"""
-        for i in range(len(self.strategy_genes)):
-            if random.random() < mutation_rate:
-                self.strategy_genes[i] = random.random()
-
-def crossover(parent1, parent2):
-    """Perform uniform crossover between two parents"""
-    child_genes = []
-    for g1, g2 in zip(parent1.strategy_genes, parent2.strategy_genes):
-        if random.random() < 0.5:
-            child_genes.append(g1)
-        else:
-            child_genes.append(g2)
-    return Individual(np.array(child_genes))
+import threading
+from time import perf_counter
+from .state import GameState
+from .board import mask_bits
+from .transposition import TranspositionTable
+from .symmetry import unique_gives
+from .search import AlphaBetaSearch, WIN_THRESHOLD
+from . import tablebase
+from .book import OpeningBook, DEFAULT_PATH as DEFAULT_BOOK_PATH
+from .mcts import MCTS, root_parallel_search, legal_actions
+from . import evolution
+from .stats import SearchStats, flatten_moves
+from .budget import SearchBudget, phase_budget
 
 class AIPlayer:
-    def __init__(self, strategy='simple'):
+    def __init__(self, strategy='simple', tt_entries=1 << 18, tablebase_path=None,
+                 book_path=None, mcts_workers=None, mcts_threads=2,
+                 mcts_batch=1, evolution_workers=None, genome_path=None,
+                 background_evolution=False, ponder=False):
         self.strategy = strategy
-        self.simulation_time = 1  # seconds to run MCTS
+        self.simulation_time = 1  # base seconds per MCTS decision
+        # Independent MCTS trees searched in parallel processes
+        self.mcts_workers = mcts_workers or os.cpu_count() or 1
+        self._process_pool = None
+        # Shared tree searched by mcts_threads threads and kept between moves;
+        # mcts_batch > 1 evaluates each leaf with that many vectorized playouts
+        self.mcts = MCTS(threads=mcts_threads, playout_batch=mcts_batch)
+        self.search_time = 1  # base seconds per minimax decision
+        # Scale the base time by the game phase when a decision has no budget
+        self.time_management = True
+        self._budget = None  # budget of the current decision
+        self.tt_entries = tt_entries  # transposition table size for minimax
+        self._transposition_table = None
+        self._searcher = None
+        self._planned_give = None  # (state key, piece) chosen along with the last move
+        # Endgame tablebase file probed by every strategy, only when given
+        self.tablebase_path = tablebase_path
+        self._tablebase = None  # loaded on first use, False when unavailable
+        # MCTS hands endgames with at most this many empty cells to an
+        # alpha-beta search to the end of the game
+        self.solve_empty = 8
+        self.opening_book = OpeningBook(book_path or DEFAULT_BOOK_PATH)  # read on first lookup
         self.population_size = 50
         self.generations = 20
         self.tournament_size = 5
-        self.population = [Individual() for _ in range(self.population_size)]
+        self.evolution_workers = evolution_workers  # fitness evaluation processes
+        self.genome_path = genome_path or evolution.DEFAULT_GENOME_PATH
+        self.population = None  # genome matrix, only built by the evolutionary strategy
         self.best_individual = None
+        self._evolution_thread = None
+        self._stop_evolution = threading.Event()
+        # Minimax and MCTS keep searching in the opponent's time after giving a
+        # piece, for at most ponder_time seconds, and reuse the cache or tree
+        self.ponder = ponder
+        self.ponder_time = 60
+        self._ponder_thread = None
+        self._ponder_stop = None
+        self._pondered = 0.0
+        self.last_stats = None  # SearchStats of the last decision
+        self._stats = None  # record being filled by the current decision
+        self._stats_listeners = []
         self.logger = logging.getLogger('quarto_debug')
         
         self.logger.debug(f"Initializing AI player with strategy: {strategy}")
         if strategy == 'evolutionary':
-            self._evolve_strategy()
-
-    def select_piece(self, game):
-        self.logger.debug(f"\nAI selecting piece using {self.strategy} strategy")
-        if self.strategy == 'simple':
-            piece_idx = self._simple_select_piece(game)
-        elif self.strategy == 'mcts':
-            piece_idx = self._mcts_select_piece(game)
-        elif self.strategy == 'evolutionary':
-            piece_idx = self._evolutionary_select_piece(game)
+            self.best_individual = evolution.load_genome(self.genome_path)
+            if self.best_individual is not None:
+                self.logger.debug(f"Loaded genome with fitness "
+                                  f"{self.best_individual.fitness:.2f} from {self.genome_path}")
+            if background_evolution:
+                self._start_background_evolution()
+            elif self.best_individual is None:
+                self._evolve_strategy()
+
+    def select_piece(self, game, with_stats=False, budget=None):
+        """Index into game.available_pieces of the piece to give.
+
+        `budget` (a SearchBudget or seconds) limits the search; by default it
+        is the strategy's base time scaled by the game phase. A SearchBudget
+        without any limit raises ValueError. With `with_stats`, returns
+        (index, SearchStats) instead.
+        """
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            self.logger.debug(f"\nAI selecting piece using {self.strategy} strategy")
+        start = perf_counter()
+        stats = self._stats = SearchStats('piece', self.strategy)
+        stats.pondered = self._stop_pondering()
+        state = GameState.from_game(game)
+        self._budget = self._decision_budget(state, budget)
+        if self._planned_give is not None and self._planned_give[0] == state.key:
+            # The give was decided together with the placement that led here
+            piece = self._planned_give[1]
+            stats.source = 'planned'
         else:
-            piece_idx = self._minimax_select_piece(game)
+            piece = self._book_select_piece(state)
+            if piece is None:
+                piece = self._tablebase_select_piece(state)
+        self._planned_give = None
+        
+        if piece is None:
+            if self.strategy == 'simple':
+                piece = self._simple_select_piece(state)
+            elif self.strategy == 'mcts':
+                piece = self._mcts_select_piece(state)
+            elif self.strategy == 'evolutionary':
+                piece = self._evolutionary_select_piece(state)
+            else:
+                piece = self._minimax_select_piece(state)
             
-        selected_piece = game.available_pieces[piece_idx]
-        self.logger.debug(f"AI selected piece: {selected_piece}")
-        return piece_idx
-
-    def make_move(self, game):
-        self.logger.debug(f"\nAI making move using {self.strategy} strategy")
-        if self.strategy == 'simple':
-            move = self._simple_make_move(game)
-        elif self.strategy == 'mcts':
-            move = self._mcts_make_move(game)
-        elif self.strategy == 'evolutionary':
-            move = self._evolutionary_make_move(game)
-        else:
-            move = self._minimax_make_move(game)
+        piece_idx = self._piece_index(game, piece)
+        stats.choice = piece
+        self._finish_stats(stats, start)
+        if self.ponder:
+            self._start_pondering(state, piece)
+        if debug:
+            self.logger.debug(f"AI selected piece: {game.available_pieces[piece_idx]} ({stats})")
+        return (piece_idx, stats) if with_stats else piece_idx
+
+    def make_move(self, game, with_stats=False, budget=None):
+        """(row, col) to place the selected piece on, or None if the board is full.
+
+        `budget` works as for select_piece. With `with_stats`, returns (move,
+        SearchStats) instead.
+        """
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            self.logger.debug(f"\nAI making move using {self.strategy} strategy")
+        start = perf_counter()
+        stats = self._stats = SearchStats('move', self.strategy)
+        stats.pondered = self._stop_pondering()
+        state = GameState.from_game(game)
+        self._budget = self._decision_budget(state, budget)
+        cell = self._book_make_move(state)
+        if cell is None:
+            cell = self._tablebase_make_move(state)
+        if cell is None:
+            if self.strategy == 'simple':
+                cell = self._simple_make_move(state)
+            elif self.strategy == 'mcts':
+                cell = self._mcts_make_move(state)
+            elif self.strategy == 'evolutionary':
+                cell = self._evolutionary_make_move(state)
+            else:
+                cell = self._minimax_make_move(state)
             
-        self.logger.debug(f"AI chose position: {move}")
-        return move
+        move = divmod(cell, 4) if cell is not None else None
+        stats.choice = cell
+        self._finish_stats(stats, start)
+        if debug:
+            self.logger.debug(f"AI chose position: {move} ({stats})")
+        return (move, stats) if with_stats else move
 
-    def _simple_select_piece(self, game):
-        """Simple strategy: randomly select an available piece"""
-        return random.randint(0, len(game.available_pieces) - 1)
-    
-    def _simple_make_move(self, game):
-        """Simple strategy: place piece in first available position"""
-        for row in range(4):
-            for col in range(4):
-                try:
-                    game_copy = deepcopy(game)
-                    game_copy.place_selected_piece(row, col)
-                    return row, col
-                except ValueError:
-                    continue
-        return None
-        
-    def _minimax_select_piece(self, game, depth=2):
-        self.logger.debug("Starting minimax piece selection...")
-        best_score = float('-inf')
-        best_piece = 0
-        
-        for i in range(len(game.available_pieces)):
-            game_copy = deepcopy(game)
-            game_copy.select_piece(i)
-            score = self._minimax(game_copy, depth, False)
-            self.logger.debug(f"Piece {i} ({game.available_pieces[i]}) score: {score}")
-            if score > best_score:
-                best_score = score
-                best_piece = i
-                
-        self.logger.debug(f"Minimax selected piece {best_piece} with score {best_score}")
+    def _decision_budget(self, state, budget):
+        """The started budget of one decision"""
+        if budget is not None:
+            budget = SearchBudget.of(budget)
+            if budget.unlimited:
+                raise ValueError("A decision needs a limited budget; pass None for the default")
+            return budget
+        seconds = self.simulation_time if self.strategy == 'mcts' else self.search_time
+        if not self.time_management:
+            return SearchBudget.of(seconds)
+        return phase_budget(state, seconds).started()
+
+    def _start_pondering(self, state, piece):
+        """Search the position after giving `piece` in a thread until the next decision.
+
+        Minimax fills the transposition table and MCTS grows the subtree that
+        the next make_move finds again after the opponent's placement and give.
+        """
+        if self.strategy not in ('minimax', 'mcts'):
+            return
+        state = state.copy()
+        state.give(piece)
+        if len(state.legal_placements()) <= 1:
+            return
+        table = self.tablebase
+        if table is not None and table.covers(state):
+            return
+        stop = self._ponder_stop = threading.Event()
+        budget = SearchBudget(time=self.ponder_time, stop=stop)
+        # One placement before MCTS hands over to alpha-beta, so that its
+        # table already holds the next endgame decisions
+        alpha_beta = (self.strategy == 'minimax' or
+                      bin(state.empty_mask).count('1') <= self.solve_empty + 1)
+
+        def ponder():
+            start = perf_counter()
+            if alpha_beta:
+                self.searcher.search(state, budget)
+            else:
+                self.mcts.search(state, budget, random.Random())
+            self._pondered = perf_counter() - start
+
+        self._pondered = 0.0
+        self._ponder_thread = threading.Thread(target=ponder, daemon=True)
+        self._ponder_thread.start()
+
+    def _stop_pondering(self):
+        """End the search in the opponent's time; returns the seconds it ran"""
+        thread = self._ponder_thread
+        if thread is None:
+            return 0.0
+        self._ponder_thread = None
+        self._ponder_stop.set()
+        # Returns within one time check or playout
+        thread.join()
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Pondered {self._pondered:.2f}s")
+        return self._pondered
+
+    def progress(self):
+        """Counters of the search in progress, safe to read from another thread"""
+        searcher = self._searcher
+        if self.strategy == 'minimax' and searcher is not None:
+            return {'nodes': searcher.nodes, 'playouts': 0, 'depth': searcher.completed_depth}
+        if self.strategy == 'mcts':
+            return {'nodes': len(self.mcts.pool or ()), 'playouts': self.mcts.playouts,
+                    'depth': self.mcts.max_depth}
+        return {'nodes': 0, 'playouts': 0, 'depth': 0}
+
+    def add_stats_listener(self, callback):
+        """Call `callback` with the SearchStats of every decision"""
+        self._stats_listeners.append(callback)
+
+    def remove_stats_listener(self, callback):
+        self._stats_listeners.remove(callback)
+
+    def _finish_stats(self, stats, start):
+        stats.elapsed = perf_counter() - start
+        self.last_stats = stats
+        self._stats = None
+        for callback in self._stats_listeners:
+            callback(stats)
+
+    @property
+    def transposition_table(self):
+        """Minimax cache, created on first use and kept for the whole game"""
+        if self._transposition_table is None:
+            self._transposition_table = TranspositionTable(self.tt_entries)
+        return self._transposition_table
+
+    @property
+    def searcher(self):
+        if self._searcher is None:
+            self._searcher = AlphaBetaSearch(self.transposition_table)
+        return self._searcher
+
+    def _book_make_move(self, state):
+        """Placement from the opening book, remembering the give that goes with it"""
+        entry = self._book_entry(state)
+        if entry is None:
+            return None
+        cell, piece, score, depth, nodes = entry
+        self._book_stats(score, depth, cell, piece)
+        self._plan_give(state, cell, piece)
+        return cell
+
+    def _book_select_piece(self, state):
+        entry = self._book_entry(state)
+        if entry is None:
+            return None
+        self._book_stats(entry[2], entry[3], entry[1])
+        return entry[1]
+
+    def _book_entry(self, state):
+        # The book holds searched moves; simple and evolutionary players keep their own
+        if self.strategy not in ('minimax', 'mcts'):
+            return None
+        return self.opening_book.lookup(state)
+
+    def _book_stats(self, score, depth, *line):
+        stats = self._stats
+        stats.source = 'book'
+        stats.score = score
+        stats.max_depth = depth
+        stats.principal_variation = tuple(action for action in line if action is not None)
+
+    def _plan_give(self, state, cell, piece):
+        """Remember the piece to give once `cell` has been played from `state`"""
+        if piece is None:
+            return
+        after = state.copy()
+        after.place(cell)
+        self._planned_give = (after.key, piece)
+
+    @property
+    def tablebase(self):
+        """Endgame tablebase memory-mapped on first use, or None without a usable file"""
+        if self._tablebase is None:
+            if self.tablebase_path is None:
+                self._tablebase = False
+                return None
+            try:
+                self._tablebase = tablebase.Tablebase(self.tablebase_path)
+                self.logger.debug(f"Loaded endgame tablebase {self.tablebase_path}")
+            except (OSError, ValueError):
+                self._tablebase = False
+        return self._tablebase or None
+
+    def _tablebase_make_move(self, state):
+        """Exact move from the endgame tablebase, for any strategy, or None"""
+        table = self.tablebase
+        result = None if table is None else table.probe(state)
+        if result is None:
+            return None
+        value, cell, piece = result
+        self._stats.source = 'tablebase'
+        self._stats.score = value
+        self._stats.principal_variation = (cell,) if piece is None else (cell, piece)
+        self._plan_give(state, cell, piece)
+        return cell
+
+    def _tablebase_select_piece(self, state):
+        """Give the piece that is worst for the opponent according to the tablebase"""
+        table = self.tablebase
+        if table is None:
+            return None
+        best_piece, best_value = None, None
+        for piece in unique_gives(state):
+            child = state.copy()
+            child.give(piece)
+            result = table.probe(child)
+            if result is None:
+                return None
+            if best_value is None or result[0] < best_value:
+                best_piece, best_value = piece, result[0]
+        self._stats.source = 'tablebase'
+        self._stats.score = best_value
+        self._stats.principal_variation = (best_piece,)
         return best_piece
+
+    def _piece_index(self, game, code):
+        """Translate a piece code back to its index in game.available_pieces"""
+        for i, piece in enumerate(game.available_pieces):
+            if piece.code == code:
+                return i
+        raise ValueError("Piece not available")
+
+    def _simple_select_piece(self, state):
+        """Simple strategy: randomly select an available piece, avoiding poison pieces"""
+        safe = state.available & ~state.threats
+        return random.choice(mask_bits(safe or state.available))
     
-    def _minimax_make_move(self, game, depth=2):
-        self.logger.debug("Starting minimax move selection...")
-        best_score = float('-inf')
-        best_move = None
+    def _simple_make_move(self, state):
+        """Simple strategy: place piece in first available position"""
+        cells = state.empty_cells()
+        return cells[0] if cells else None
         
-        for row in range(4):
-            for col in range(4):
-                try:
-                    game_copy = deepcopy(game)
-                    game_copy.place_selected_piece(row, col)
-                    score = self._minimax(game_copy, depth, False)
-                    self.logger.debug(f"Position ({row}, {col}) score: {score}")
-                    if score > best_score:
-                        best_score = score
-                        best_move = (row, col)
-                except ValueError:
-                    continue
-                    
-        self.logger.debug(f"Minimax selected move {best_move} with score {best_score}")
-        return best_move
+    def _minimax_select_piece(self, state):
+        _, piece = self._minimax_search(state)
+        return piece
     
-    def _minimax(self, game, depth, is_maximizing):
-        """Minimax algorithm implementation"""
-        if depth == 0 or game.is_game_over():
-            return self._evaluate_position(game)
-            
-        if is_maximizing:
-            max_score = float('-inf')
-            for row in range(4):
-                for col in range(4):
-                    try:
-                        game_copy = deepcopy(game)
-                        game_copy.place_selected_piece(row, col)
-                        score = self._minimax(game_copy, depth - 1, False)
-                        max_score = max(max_score, score)
-                    except ValueError:
-                        continue
-            return max_score
-        else:
-            min_score = float('inf')
-            for row in range(4):
-                for col in range(4):
-                    try:
-                        game_copy = deepcopy(game)
-                        game_copy.place_selected_piece(row, col)
-                        score = self._minimax(game_copy, depth - 1, True)
-                        min_score = min(min_score, score)
-                    except ValueError:
-                        continue
-            return min_score
+    def _minimax_make_move(self, state):
+        cell, piece = self._minimax_search(state)
+        self._plan_give(state, cell, piece)
+        return cell
     
-    def _evaluate_position(self, game):
-        """Evaluate the current game position"""
-        if game.check_win():
-            return 1 if game.current_player == 0 else -1
-        return 0
+    def _minimax_search(self, state, budget=None):
+        """Best (cell, code) move, with the search recorded in the current stats"""
+        searcher = self.searcher
+        table = self.transposition_table
+        hits = table.hits
+        move, score = searcher.search(state, budget or self._budget)
+        stats = self._stats
+        stats.score = score
+        stats.nodes = searcher.nodes
+        stats.max_depth = searcher.completed_depth
+        stats.cache_hits = table.hits - hits
+        stats.principal_variation = flatten_moves(searcher.principal_variation)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Transposition table: {table.stats()}")
+        return move
     
-    def _mcts_select_piece(self, game):
-        """MCTS strategy for selecting a piece using parallel processing"""
-        available_pieces = list(range(len(game.available_pieces)))
-        if not available_pieces:
+    def _mcts_select_piece(self, state):
+        """MCTS strategy for selecting a piece"""
+        move = self._mcts_endgame(state)
+        if move is not None:
+            return move[1]
+        piece = self._mcts_search(state)
+        if piece is None:
+            return self._simple_select_piece(state)
+        return piece
+
+    def _mcts_make_move(self, state):
+        move = self._mcts_endgame(state)
+        if move is not None:
+            self._plan_give(state, *move)
+            return move[0]
+        cell = self._mcts_search(state)
+        if cell is None:
+            return self._simple_make_move(state)
+        # The same tree has already searched the give that follows
+        self._plan_give(state, cell, self.mcts.best_reply(cell))
+        return cell
+
+    def _mcts_endgame(self, state):
+        """The (cell, code) move of an alpha-beta search to the end of the game, or None.
+
+        Alpha-beta proves small endgames in milliseconds, where MCTS would
+        only sample them. It gets half of the decision's budget; if it cannot
+        finish, MCTS searches as usual.
+        """
+        empty = bin(state.empty_mask).count('1')
+        if empty > self.solve_empty:
+            return None
+        budget = self._budget
+        remaining = budget.remaining()
+        move = self._minimax_search(state, SearchBudget(
+            None if remaining is None else remaining / 2,
+            None if budget.nodes is None else budget.nodes // 2,
+            stop=budget.stop).started())
+        stats = self._stats
+        if move is None or self.searcher.completed_depth < empty and abs(stats.score) <= WIN_THRESHOLD:
+            # Unproven: MCTS records its own search
+            stats.score = None
+            stats.nodes = stats.max_depth = stats.cache_hits = 0
+            stats.principal_variation = ()
             return None
+        stats.source = 'solver'
+        return move
 
-        max_workers = min(32, (os.cpu_count() or 1) * 2)
-        piece_results = {piece: 0 for piece in available_pieces}
-        simulations_per_piece = 10
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = []
-            for piece in available_pieces:
-                for _ in range(simulations_per_piece):
-                    futures.append(
-                        executor.submit(
-                            self._parallel_piece_simulation,
-                            deepcopy(game),
-                            piece
-                        )
-                    )
-            
-            for future in as_completed(futures):
-                piece, result = future.result()
-                if result == 1:  # Victoria para la IA
-                    piece_results[piece] += 1
-
-        return max(piece_results.items(), key=lambda x: x[1])[0]
-
-    def _parallel_piece_simulation(self, game, piece):
-        """Ejecuta una simulación paralela para la selección de pieza"""
-        game.select_piece(piece)
-        result = self._simulate_random_game(game)
-        return piece, result
-
-    def _mcts_make_move(self, game):
-        self.logger.debug("Starting MCTS move selection...")
-        root = Node(deepcopy(game))
-        end_time = time() + self.simulation_time
-        max_workers = min(32, (os.cpu_count() or 1) * 2)
-
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            while time() < end_time:
-                futures = []
-                for _ in range(max_workers):
-                    futures.append(executor.submit(self._parallel_mcts_iteration, root))
-                
-                for future in as_completed(futures):
-                    if time() >= end_time:
-                        break
-
-        # Select the move with the highest number of visits
-        if root.children:
-            best_child = max(root.children, key=lambda c: c.visits)
-            self.logger.debug(f"MCTS stats - Total simulations: {root.visits}")
-            for child in root.children:
-                win_rate = child.wins / child.visits if child.visits > 0 else 0
-                self.logger.debug(f"Move option - Visits: {child.visits}, Win rate: {win_rate:.2f}")
-
-            for row in range(4):
-                for col in range(4):
-                    try:
-                        game_copy = deepcopy(game)
-                        game_copy.place_selected_piece(row, col)
-                        if game_copy.board == best_child.game_state.board:
-                            return row, col
-                    except ValueError:
-                        continue
-        
-        self.logger.debug("MCTS fallback to simple strategy")
-        return self._simple_make_move(game)
-
-    def _parallel_mcts_iteration(self, root):
-        """Ejecuta una iteración de MCTS en paralelo"""
-        node = self._select(root)
-        if node.untried_moves:
-            child = self._expand(node)
-            result = self._simulate(child)
-            self._backpropagate(child, result)
-        return True
-
-    def _select(self, node):
-        """Select a leaf node using UCT formula"""
-        while node.children and not node.untried_moves:
-            node = max(node.children, key=lambda n: 
-                n.wins/n.visits + math.sqrt(2*math.log(n.parent.visits)/n.visits))
-        return node
-
-    def _expand(self, node):
-        """Expand the tree by creating a new child node"""
-        if not node.untried_moves:
-            return node
-        move = random.choice(node.untried_moves)
-        node.untried_moves.remove(move)
-        
-        new_state = deepcopy(node.game_state)
-        row, col = move
-        new_state.place_selected_piece(row, col)
-        
-        child = Node(new_state, parent=node)
-        node.children.append(child)
-        return child
-
-    def _simulate(self, node):
-        """Run a random simulation from the node"""
-        return self._simulate_random_game(deepcopy(node.game_state))
-
-    def _simulate_random_game(self, game):
-        """Play random moves until game is over"""
-        while True:
-            # Check if game is won before making any moves
-            if game.check_win():
-                return 1 if game.current_player == 1 else -1
-            
-            if game.board.is_full():
-                return 0
-                
-            moves = []
-            for row in range(4):
-                for col in range(4):
-                    try:
-                        game_copy = deepcopy(game)
-                        game_copy.place_selected_piece(row, col)
-                        moves.append((row, col))
-                    except ValueError:
-                        continue
-            
-            if not moves:
-                break
-                
-            row, col = random.choice(moves)
-            game.place_selected_piece(row, col)
-            
-            if len(game.available_pieces) > 0:
-                piece = random.randint(0, len(game.available_pieces) - 1)
-                game.select_piece(piece)
-        
-        return 0
+    def _mcts_search(self, state):
+        """Search the persistent MCTS tree, helped by root-parallel worker processes.
+
+        Returns the most visited cell or piece, or None if there is none.
+        """
+        tree = self.mcts
+        actions = legal_actions(state, root=True)
+        if len(actions) == 1:
+            # Forced, including a winning placement: no time spent
+            self._stats.principal_variation = (actions[0],)
+            return actions[0]
+        workers = self.mcts_workers
+        if workers > 1 and self._budget.share(workers).unlimited:
+            # Only the stop event ends this search, and it cannot reach other processes
+            workers = 1
+        root_stats = root_parallel_search(state, self._budget, workers,
+                                          self._mcts_executor() if workers > 1 else None,
+                                          random, tree)
+        if not root_stats:
+            self.logger.debug("MCTS fallback to simple strategy")
+            return None
 
-    def _backpropagate(self, node, result):
-        """Backpropagate the result up the tree"""
-        while node:
-            node.visits += 1
-            node.wins += result
-            node = node.parent
+        # Select the action with the highest number of visits
+        best_action = max(root_stats, key=lambda action: root_stats[action][0])
+        visits, net_wins = root_stats[best_action]
+        stats = self._stats
+        stats.score = net_wins / visits  # wins minus losses per playout
+        # Each playout visits one root child, so the visits not carried over are new playouts
+        stats.playouts = sum(visits for visits, _ in root_stats.values()) - tree.reused_visits
+        stats.nodes = tree.nodes_added
+        stats.max_depth = tree.max_depth
+        stats.cache_hits = tree.reused_visits
+        stats.principal_variation = tree.principal_variation(best_action)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"MCTS node pool: {tree.pool.stats()}, {self.mcts_workers} workers")
+            for action, (visits, net_wins) in root_stats.items():
+                self.logger.debug(f"Action {action} - Visits: {visits}, "
+                                  f"Mean result: {net_wins / visits:+.2f}")
+        return best_action
+
+    def _mcts_executor(self):
+        if self.mcts_workers <= 1:
+            return None
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.mcts_workers)
+        return self._process_pool
+
+    def close(self):
+        """Stop pondering and shut down the MCTS worker processes and background evolution"""
+        self._stop_pondering()
+        self._stop_evolution.set()
+        if self._process_pool is not None:
+            self._process_pool.shutdown(cancel_futures=True)
+            self._process_pool = None
+
+    def _new_population(self):
+        """Random genome matrix, seeded with the best known genome"""
+        population = evolution.random_population(self.population_size)
+        if self.best_individual is not None:
+            population[0] = self.best_individual.strategy_genes
+        return population
 
     def _evolve_strategy(self):
-        """Evolve the population through multiple generations"""
-        for generation in range(self.generations):
-            # Evaluate fitness for each individual
-            for individual in self.population:
-                individual.fitness = self._evaluate_individual(individual)
-            
-            # Selection and breeding
-            new_population = []
-            while len(new_population) < self.population_size:
-                parent1 = self._tournament_select()
-                parent2 = self._tournament_select()
-                child = crossover(parent1, parent2)
-                child.mutate()
-                new_population.append(child)
-                
-            self.population = new_population
-            self.best_individual = max(self.population, key=lambda x: x.fitness)
-
-    def _tournament_select(self):
-        """Select an individual using tournament selection"""
-        tournament = random.sample(self.population, self.tournament_size)
-        return max(tournament, key=lambda x: x.fitness)
-
-    def _evaluate_individual(self, individual):
-        """Evaluate an individual by playing games"""
-        wins = 0
-        games = 5  # Number of games to evaluate fitness
-        
-        for _ in range(games):
-            game = deepcopy(self._create_new_game())
-            result = self._play_game_with_strategy(game, individual)
-            if result == 1:
-                wins += 1
-                
-        return wins / games
-
-    def _evolutionary_select_piece(self, game):
+        """Evolve the population through multiple generations and cache the best genome"""
+        self.population, self.best_individual = evolution.evolve(
+            self._new_population(), self.generations, self.tournament_size,
+            workers=self.evolution_workers, progress=self._log_generation)
+        self._save_genome(self.best_individual)
+
+    def _save_genome(self, individual):
+        """Cache `individual` for later players; a cache that cannot be written is skipped"""
+        try:
+            evolution.save_genome(self.genome_path, individual)
+        except OSError as e:
+            self.logger.warning(f"Could not save the genome to {self.genome_path}: {e}")
+
+    def _log_generation(self, generation, best, mean, elapsed):
+        self.logger.debug(f"Generation {generation}: best fitness {best.fitness:.2f}, "
+                          f"mean {mean:.2f} ({elapsed:.2f}s)")
+
+    def _start_background_evolution(self):
+        """Keep evolving in a daemon thread; play with the best genome found so far"""
+        self._evolution_thread = threading.Thread(target=self._background_evolution, daemon=True)
+        self._evolution_thread.start()
+
+    def _background_evolution(self):
+        def on_generation(generation, best, mean, elapsed):
+            self._log_generation(generation, best, mean, elapsed)
+            current = self.best_individual
+            score = None
+            if current is not None:
+                # Fitness against random play saturates, so the candidate has
+                # to beat the genome being played head to head
+                score = evolution.head_to_head(best.strategy_genes, current.strategy_genes)
+                if score < evolution.SWAP_SCORE:
+                    return
+            # A single attribute assignment, so moves see either genome whole
+            self.best_individual = best
+            self._save_genome(best)
+            self.logger.debug(f"Switched to genome with fitness {best.fitness:.2f}, "
+                              f"head-to-head score {score}")
+
+        self.population = self._new_population()
+        while not self._stop_evolution.is_set():
+            self.population, _ = evolution.evolve(
+                self.population, self.generations, self.tournament_size,
+                workers=self.evolution_workers, progress=on_generation,
+                stop=self._stop_evolution)
+
+    def _evolutionary_select_piece(self, state):
         """Use evolved strategy to select a piece"""
         if not self.best_individual:
-            return self._simple_select_piece(game)
-            
-        available_pieces = list(range(len(game.available_pieces)))
-        if not available_pieces:
-            return None
-            
-        # Use the first 16 genes for piece selection
-        piece_preferences = self.best_individual.strategy_genes[:16]
-        piece_scores = []
-        
-        for piece in available_pieces:
-            piece_score = piece_preferences[piece]
-            # Add heuristic information
-            game_copy = deepcopy(game)
-            game_copy.select_piece(piece)
-            if self._leads_to_win(game_copy):
-                piece_score += 1.0
-                
-            piece_scores.append((piece_score, piece))
-            
-        return max(piece_scores, key=lambda x: x[0])[1]
+            return self._simple_select_piece(state)
+        return evolution.select_piece(state, self.best_individual.strategy_genes)
 
-    def _evolutionary_make_move(self, game):
+    def _evolutionary_make_move(self, state):
         """Use evolved strategy to make a move"""
         if not self.best_individual:
-            return self._simple_make_move(game)
-            
-        # Use the last 16 genes for move placement (4x4 board)
-        placement_preferences = self.best_individual.strategy_genes[16:].reshape(4, 4)
-        best_score = float('-inf')
-        best_move = None
-        
-        for row in range(4):
-            for col in range(4):
-                try:
-                    game_copy = deepcopy(game)
-                    game_copy.place_selected_piece(row, col)
-                    
-                    score = placement_preferences[row][col]
-                    # Add heuristic information
-                    if game_copy.check_win():
-                        score += 1.0
-                    elif self._creates_winning_opportunity(game_copy):
-                        score -= 0.5
-                        
-                    if score > best_score:
-                        best_score = score
-                        best_move = (row, col)
-                except ValueError:
-                    continue
-                    
-        return best_move
-
-    def _leads_to_win(self, game):
-        """Check if the current state leads to an immediate win"""
-        for row in range(4):
-            for col in range(4):
-                try:
-                    game_copy = deepcopy(game)
-                    game_copy.place_selected_piece(row, col)
-                    if game_copy.check_win():
-                        return True
-                except ValueError:
-                    continue
-        return False
-
-    def _creates_winning_opportunity(self, game):
-        """Check if the move creates a winning opportunity for the opponent"""
-        if len(game.available_pieces) == 0:
-            return False
-            
-        for piece in range(len(game.available_pieces)):
-            game_copy = deepcopy(game)
-            game_copy.select_piece(piece)
-            if self._leads_to_win(game_copy):
-                return True
-        return False
-
-    def _create_new_game(self):
-        """Create a new game instance for evaluation"""
-        from .game import Game
-        return Game()
-
-    def _play_game_with_strategy(self, game, individual):
-        """Play a game using the evolved strategy from an individual"""
-        while not game.is_game_over():
-            try:
-                # Use evolved strategy for piece selection
-                if len(game.available_pieces) > 0:
-                    piece_idx = self._evolutionary_select_piece(game)
-                    if piece_idx is not None:
-                        game.select_piece(piece_idx)
-                
-                # Use evolved strategy for move placement
-                if game.selected_piece is not None:
-                    move = self._evolutionary_make_move(game)
-                    if move is not None:
-                        row, col = move
-                        game.place_selected_piece(row, col)
-                        
-                        if game.check_win():
-                            return 1  # Win
-                    else:
-                        return 0  # Draw
-                
-            except ValueError:
-                continue
-                
-        return 0  # Draw if game ends without winning
\ No newline at end of file
+            return self._simple_make_move(state)
+        return evolution.make_move(state, self.best_individual.strategy_genes)
\ No newline at end of file
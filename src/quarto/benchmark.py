@@ -0,0 +1,307 @@
+"""Micro and macro benchmarks of the engine, compared against a stored baseline.
+
+Every benchmark measures one number: a rate (higher is better) or a time or
+memory figure (lower is better). Results are written as JSON and compared
+with a baseline; a benchmark regresses when it is worse than the baseline by
+more than the threshold. Run from the `src` directory with:
+
+    python -m quarto.benchmark --output results.json
+    python -m quarto.benchmark --save-baseline
+
+Baselines depend on the machine, so compare runs made on the same hardware.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tracemalloc
+from time import perf_counter
+
+import numpy as np
+
+from .state import GameState
+from .search import AlphaBetaSearch
+from .mcts import MCTS
+from .playout import random_playout, batch_playouts
+from .budget import SearchBudget
+from . import evolution
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'data', 'benchmark_baseline.json')
+DEFAULT_THRESHOLD = 0.25  # relative change counted as a regression
+FORMAT_VERSION = 1
+# Fixed workloads of the memory benchmarks, so that a faster machine does
+# not search more and look like a regression
+MINIMAX_MEMORY_NODES = 100000
+MCTS_MEMORY_PLAYOUTS = 5000
+
+
+def _positions(count, pieces, seed=0):
+    """`count` random positions with `pieces` pieces on the board and a piece in hand.
+
+    The piece in hand never wins at once, so searches have work to do.
+    """
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        state = GameState()
+        for _ in range(pieces):
+            state.give(rng.choice(state.legal_gives()))
+            if state.place(rng.choice(state.legal_placements())):
+                break
+        else:
+            state.give(rng.choice(state.legal_gives()))
+            if not state.can_win():
+                positions.append(state)
+    return positions
+
+
+def _rate(operation, duration):
+    """Calls of `operation` per second; it returns how many operations it did"""
+    done = 0
+    start = perf_counter()
+    while True:
+        done += operation()
+        elapsed = perf_counter() - start
+        if elapsed >= duration:
+            return done / elapsed
+
+
+def bench_win_detection(duration):
+    """Placements with incremental win detection, undone again (GameState)"""
+    positions = _positions(64, 8)
+
+    def operation():
+        for state in positions:
+            for cell in state.legal_placements():
+                state.push_place(cell)
+                state.pop()
+        return sum(len(state.legal_placements()) for state in positions)
+    return _rate(operation, duration)
+
+
+def bench_game_check_win(duration):
+    """Game.check_win on mid-game positions"""
+    games = [state.to_game() for state in _positions(64, 8)]
+
+    def operation():
+        for game in games:
+            game.check_win()
+        return len(games)
+    return _rate(operation, duration)
+
+
+def bench_legal_moves(duration):
+    """Generation of the placements and, after each, the gives"""
+    positions = _positions(64, 6)
+
+    def operation():
+        moves = 0
+        for state in positions:
+            for cell in state.legal_placements():
+                state.push_place(cell)
+                moves += len(state.legal_gives())
+                state.pop()
+        return moves
+    return _rate(operation, duration)
+
+
+def bench_state_copy(duration):
+    positions = _positions(64, 8)
+
+    def operation():
+        for state in positions:
+            state.copy()
+        return len(positions)
+    return _rate(operation, duration)
+
+
+def bench_random_playouts(duration):
+    """Single Python playouts from the first placement"""
+    state = _positions(1, 0)[0]
+    rng = random.Random(0)
+
+    def operation():
+        random_playout(state.copy(), rng)
+        return 1
+    return _rate(operation, duration)
+
+
+def bench_batch_playouts(duration):
+    """NumPy batch playouts from the first placement, 1024 per call"""
+    state = _positions(1, 0)[0]
+    rng = np.random.default_rng(0)
+    return _rate(lambda: len(batch_playouts(state, 1024, rng)), duration)
+
+
+def bench_minimax_nodes(duration):
+    """Alpha-beta nodes per second from a position with 6 pieces placed"""
+    search = AlphaBetaSearch()
+    start = perf_counter()
+    search.search(_positions(1, 6)[0], duration)
+    return search.nodes / (perf_counter() - start)
+
+
+def bench_mcts_iterations(duration):
+    """Single-threaded MCTS playouts per second from the first placement"""
+    tree = MCTS()
+    start = perf_counter()
+    tree.search(_positions(1, 0)[0], duration, random.Random(0))
+    return tree.playouts / (perf_counter() - start)
+
+
+def bench_evolution_generation(duration):
+    """Seconds for one generation of 10 genomes, evaluated in this process"""
+    population = evolution.random_population(10, np.random.default_rng(0))
+    start = perf_counter()
+    evolution.evolve(population, 1, workers=1, seed=0)
+    return perf_counter() - start
+
+
+def _peak_memory(search):
+    """Peak bytes allocated by `search`, after an untraced warm-up run.
+
+    The warm-up fills lazily built module caches such as the mask_bits
+    table, which would otherwise count in the first run only.
+    """
+    search()
+    tracemalloc.start()
+    try:
+        search()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_minimax_memory(duration):
+    """Peak bytes allocated by a minimax search of MINIMAX_MEMORY_NODES nodes; ignores `duration`"""
+    state = _positions(1, 6)[0]
+    budget = SearchBudget(nodes=MINIMAX_MEMORY_NODES)
+    return _peak_memory(lambda: AlphaBetaSearch().search(state, budget))
+
+
+def bench_mcts_memory(duration):
+    """Peak bytes allocated by an MCTS search of MCTS_MEMORY_PLAYOUTS playouts; ignores `duration`"""
+    state = _positions(1, 0)[0]
+    budget = SearchBudget(nodes=MCTS_MEMORY_PLAYOUTS)
+    return _peak_memory(lambda: MCTS().search(state, budget, random.Random(0)))
+
+
+# name -> (function, unit, higher is better)
+BENCHMARKS = {
+    'win_detection': (bench_win_detection, 'placements/s', True),
+    'game_check_win': (bench_game_check_win, 'calls/s', True),
+    'legal_moves': (bench_legal_moves, 'moves/s', True),
+    'state_copy': (bench_state_copy, 'copies/s', True),
+    'random_playouts': (bench_random_playouts, 'playouts/s', True),
+    'batch_playouts': (bench_batch_playouts, 'playouts/s', True),
+    'minimax_nodes': (bench_minimax_nodes, 'nodes/s', True),
+    'mcts_iterations': (bench_mcts_iterations, 'playouts/s', True),
+    'evolution_generation': (bench_evolution_generation, 's', False),
+    'minimax_peak_memory': (bench_minimax_memory, 'bytes', False),
+    'mcts_peak_memory': (bench_mcts_memory, 'bytes', False),
+}
+
+
+def run_benchmarks(names=None, duration=1.0, repeat=3, progress=None):
+    """Run the benchmarks `names` (default: all) and return the results document.
+
+    Each benchmark runs `repeat` times and keeps its best value, which is
+    far less noisy than a single run.
+    """
+    results = {}
+    for name in names or BENCHMARKS:
+        if name not in BENCHMARKS:
+            raise ValueError(f"Unknown benchmark '{name}'")
+        function, unit, higher_is_better = BENCHMARKS[name]
+        values = [function(duration) for _ in range(repeat)]
+        value = max(values) if higher_is_better else min(values)
+        results[name] = {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+        if progress:
+            progress(name, value, unit)
+    return {'version': FORMAT_VERSION, 'python': platform.python_version(),
+            'machine': platform.machine(), 'duration': duration, 'repeat': repeat,
+            'results': results}
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Compare two results documents.
+
+    Returns a list of (name, baseline value, value, relative change,
+    regressed) for the benchmarks present in both; the change is positive
+    when the result is better than the baseline.
+    """
+    rows = []
+    for name, result in results['results'].items():
+        base = baseline['results'].get(name)
+        if base is None or not base['value']:
+            continue
+        change = (result['value'] - base['value']) / base['value']
+        if not result['higher_is_better']:
+            change = -change
+        rows.append((name, base['value'], result['value'], change, change < -threshold))
+    return rows
+
+
+def load_results(path):
+    with open(path) as f:
+        data = json.load(f)
+    if data.get('version') != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a version {FORMAT_VERSION} benchmark file")
+    return data
+
+
+def save_results(path, results):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+        f.write('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Quarto engine benchmarks")
+    parser.add_argument('benchmarks', nargs='*', help=f"default: all of {', '.join(BENCHMARKS)}")
+    parser.add_argument('--duration', type=float, default=1.0,
+                        help="seconds per timed benchmark")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="runs per benchmark, keeping the best")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown reported as a regression")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="store the results as the new baseline instead of comparing")
+    args = parser.parse_args(argv)
+
+    try:
+        results = run_benchmarks(args.benchmarks, args.duration, args.repeat,
+                                 progress=lambda name, value, unit:
+                                 print(f"{name:22} {value:14.6g} {unit}", flush=True))
+    except ValueError as e:
+        parser.error(str(e))
+    if args.output:
+        save_results(args.output, results)
+    if args.save_baseline:
+        save_results(args.baseline, results)
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    try:
+        baseline = load_results(args.baseline)
+    except (OSError, ValueError) as e:
+        print(f"No baseline to compare with: {e}")
+        return
+    rows = compare(results, baseline, args.threshold)
+    print(f"\nCompared with {args.baseline} (threshold {args.threshold:.0%}):")
+    for name, base, value, change, regressed in rows:
+        print(f"{name:22} {base:14.6g} -> {value:14.6g} {change:+7.1%}"
+              f"{'  REGRESSION' if regressed else ''}")
+    if any(row[4] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
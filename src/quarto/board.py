@@ -1,24 +1,108 @@
+# Every line as a tuple of cell indices (cell = row * 4 + col)
+LINES = (
+    tuple(tuple(r * 4 + c for c in range(4)) for r in range(4)) +
+    tuple(tuple(r * 4 + c for r in range(4)) for c in range(4)) +
+    (tuple(i * 5 for i in range(4)), tuple(i * 4 + 3 - i for i in range(4)))
+)
+LINE_MASKS = tuple(sum(1 << cell for cell in line) for line in LINES)
+# Indices of the 2 or 3 lines going through each cell
+CELL_LINES = tuple(tuple(i for i, line in enumerate(LINES) if cell in line)
+                   for cell in range(16))
+
+
+FULL_MASK = 0xFFFF
+
+# Lookup table from a 16-bit mask to the indices of its set bits, filled on demand
+_MASK_BITS = {}
+
+
+def mask_bits(mask):
+    """Indices of the set bits of a 16-bit cell or piece mask, as a tuple"""
+    bits = _MASK_BITS.get(mask)
+    if bits is None:
+        bits = _MASK_BITS[mask] = tuple(i for i in range(16) if mask >> i & 1)
+    return bits
+
+
+def line_wins(common_set, any_set):
+    """A full line wins when its pieces all have an attribute set or all cleared.
+
+    common_set is the AND of the line's piece codes and any_set their OR.
+    """
+    return common_set != 0 or any_set != 0xF
+
+
 class Board:
     def __init__(self):
         self.size = 4
         self.board = [[None for _ in range(self.size)] for _ in range(self.size)]
+        # Running per-line accumulators, updated on each placement
+        self._line_counts = [0] * len(LINES)
+        self._line_and = [0xF] * len(LINES)
+        self._line_or = [0] * len(LINES)
+        self._winning_lines = 0
+        self.empty_mask = FULL_MASK  # bit (row * 4 + col) set while the cell is empty
         
     def place_piece(self, piece, row, col):
+        """Place a piece and return True if it completed a winning line"""
         if not (0 <= row < self.size and 0 <= col < self.size):
             raise ValueError("Invalid position")
         if self.board[row][col] is not None:
             raise ValueError("Position already occupied")
         self.board[row][col] = piece
+        cell = row * self.size + col
+        self.empty_mask &= ~(1 << cell)
+        
+        code = piece.code
+        won = False
+        for line in CELL_LINES[cell]:
+            self._line_counts[line] += 1
+            self._line_and[line] &= code
+            self._line_or[line] |= code
+            if self._line_counts[line] == 4 and line_wins(self._line_and[line], self._line_or[line]):
+                self._winning_lines += 1
+                won = True
+        return won
+        
+    def remove_piece(self, row, col):
+        """Take a piece back off the board, undoing place_piece"""
+        piece = self.get_piece(row, col)
+        if piece is None:
+            raise ValueError("Position is empty")
+        cell = row * self.size + col
+        lines = CELL_LINES[cell]
+        for line in lines:
+            if self._line_counts[line] == 4 and line_wins(self._line_and[line], self._line_or[line]):
+                self._winning_lines -= 1
+        self.board[row][col] = None
+        self.empty_mask |= 1 << cell
+        
+        # AND/OR cannot be undone, so rebuild the affected lines from their cells
+        for line in lines:
+            count, common, union = 0, 0xF, 0
+            for cell in LINES[line]:
+                other = self.board[cell // self.size][cell % self.size]
+                if other is not None:
+                    count += 1
+                    common &= other.code
+                    union |= other.code
+            self._line_counts[line] = count
+            self._line_and[line] = common
+            self._line_or[line] = union
+        return piece
         
     def get_piece(self, row, col):
         if not (0 <= row < self.size and 0 <= col < self.size):
             raise ValueError("Invalid position")
         return self.board[row][col]
     
+    def empty_cells(self):
+        """(row, col) of every empty cell, read from the maintained empty mask"""
+        return [divmod(cell, self.size) for cell in mask_bits(self.empty_mask)]
+    
     def is_full(self):
-        return all(all(cell is not None for cell in row) for row in self.board)
+        return self.empty_mask == 0
     
     def check_win(self):
-        # Check rows, columns, and diagonals for winning combinations
-        # Will be implemented with the winning logic
-        pass
\ No newline at end of file
+        """Check rows, columns, and diagonals for winning combinations"""
+        return self._winning_lines > 0
\ No newline at end of file
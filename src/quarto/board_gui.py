@@ -99,6 +99,10 @@ class BoardGUI:
                                   font=('TkDefaultFont', 12, 'bold'))
         self.turn_label.pack(side=tk.LEFT)
         
+        # Status line for instructions and the AI's progress while it thinks
+        self.status_label = ttk.Label(self.main_frame, text="", font=('TkDefaultFont', 11))
+        self.status_label.pack(side=tk.BOTTOM, fill=tk.X, pady=(10, 0))
+        
         # Board frame
         self.board_frame = ttk.Frame(self.main_frame)
         self.board_frame.pack(side=tk.LEFT, padx=(0, 10))
@@ -156,8 +160,14 @@ class BoardGUI:
             lambda e: self.pieces_canvas.yview_scroll(-1 * (e.delta // 120), 'units')
         )
 
-        # List to store piece buttons
-        self.piece_buttons = []
+        # Configure the style for piece buttons
+        style = ttk.Style()
+        style.configure('Piece.TButton', 
+                      font=('TkDefaultFont', 12),
+                      padding=10)
+        
+        # Piece buttons by piece code, shown while the piece is available
+        self.piece_buttons = {}
         self.pieces_enabled = True  # Track if piece selection is enabled
 
         # Draw the board grid
@@ -167,7 +177,18 @@ class BoardGUI:
             # Horizontal lines
             self.canvas.create_line(0, i * 120, 480, i * 120, width=2)
         
-        self.cells = {}  # Store piece displays
+        # One text item per cell, changed only when a piece is placed there
+        self.cell_items = [self.canvas.create_text(col * 120 + 60, row * 120 + 60, text="",
+                                                   font=('TkDefaultFont', 16, 'bold'))
+                           for row in range(4) for col in range(4)]
+        
+        # What the last redraw showed, so that the next one only applies changes
+        self._game = None
+        self._redraw_id = None
+        self._shown_cells = [None] * 16  # piece code in each cell
+        self._shown_pieces = set()  # codes of the shown piece buttons
+        self._shown_enabled = None
+        self._shown_labels = None
         
         # Bind click events
         self.canvas.bind('<Button-1>', self._on_board_click)
@@ -182,6 +203,12 @@ class BoardGUI:
                             text="Quit Game",
                             command=self.window.destroy)
         quit_btn.pack(side=tk.RIGHT, padx=10)
+        
+        # New game button, handled by the game logic through <<NewGame>>
+        new_game_btn = ttk.Button(self.info_frame,
+                                text="New Game",
+                                command=lambda: self.window.event_generate('<<NewGame>>', when='tail'))
+        new_game_btn.pack(side=tk.RIGHT)
 
     def _on_board_click(self, event):
         # Convert click coordinates to board position
@@ -192,141 +219,120 @@ class BoardGUI:
             pass
             
     def update_board(self, game):
-        # Check if window still exists
-        try:
-            if not self.window.winfo_exists():
+        """Show `game`; the redraw runs once when Tk is idle, however often this is called"""
+        self._game = game
+        if self._redraw_id is None:
+            try:
+                self._redraw_id = self.window.after_idle(self._redraw)
+            except tk.TclError:
+                # Window was destroyed
                 return
-                
-            # Clear previous pieces
-            for widget in self.cells.values():
-                if widget.winfo_exists():
-                    widget.destroy()
-            self.cells.clear()
-            
-            # Update turn label
+
+    def _redraw(self):
+        """Apply the changes since the last redraw to the persistent cell and piece items"""
+        self._redraw_id = None
+        game = self._game
+        try:
+            # Board cells
+            for cell, item in enumerate(self.cell_items):
+                piece = game.board.get_piece(cell // 4, cell % 4)
+                code = None if piece is None else piece.code
+                if code != self._shown_cells[cell]:
+                    self._shown_cells[cell] = code
+                    self.canvas.itemconfigure(item, text=self._get_board_display(piece))
+
+            # Available pieces
+            available = {piece.code: piece for piece in game.available_pieces}
+            for code in self._shown_pieces - available.keys():
+                self.piece_buttons[code].master.grid_remove()
+            state = 'normal' if self.pieces_enabled else 'disabled'
+            for code in available.keys() - self._shown_pieces:
+                button = self._piece_button(available[code])
+                button.configure(state=state)
+                button.master.grid()
+            if self.pieces_enabled != self._shown_enabled:
+                for code in available:
+                    self.piece_buttons[code].configure(state=state)
+            self._shown_pieces = set(available)
+            self._shown_enabled = self.pieces_enabled
+
+            # Turn and selected piece
             current_player = "Human" if game.current_player == 0 else "AI"
-            self.turn_label.config(text=f"Current Turn: {current_player}")
-            
-            # Display current pieces on board
-            for row in range(4):
-                for col in range(4):
-                    piece = game.board.get_piece(row, col)
-                    if piece is not None:
-                        self._draw_piece(piece, row, col)
-            
-            # Update available pieces
-            self._update_available_pieces(game)
-            
-            # Update selected piece
-            if game.selected_piece:
-                self.selected_piece_label.config(text=f"Selected Piece: {str(game.selected_piece)}")
-            else:
-                self.selected_piece_label.config(text="Selected Piece: None")
-            
-            self.window.update()
+            selected = str(game.selected_piece) if game.selected_piece else "None"
+            if (current_player, selected) != self._shown_labels:
+                self._shown_labels = (current_player, selected)
+                self.turn_label.config(text=f"Current Turn: {current_player}")
+                self.selected_piece_label.config(text=f"Selected Piece: {selected}")
         except tk.TclError:
             # Window was destroyed
             return
 
-    def _draw_piece(self, piece, row, col):
-        frame = ttk.Frame(self.canvas)
-        self.cells[(row, col)] = frame
+    def _get_board_display(self, piece):
+        if piece is None:
+            return ""
         
-        # Create piece visualization using concatenated symbols
+        # Piece visualization using concatenated symbols
         size = "▲" if piece.height else "▼"
         color = "⚫" if piece.color else "⚪"
         fill = "■" if piece.solidity else "□"
         shape = "◼" if piece.shape else "🔵"
         
-        piece_display = f"{size}{color}{fill}{shape}"
-        
-        # Create label with the concatenated symbols
-        label = ttk.Label(frame, 
-                         text=piece_display,
-                         font=('TkDefaultFont', 16, 'bold'))
-        label.pack(expand=True, pady=5)
-        
-        # Place in the grid
-        self.canvas.create_window(
-            col * 120 + 60,
-            row * 120 + 60,
-            window=frame,
-            width=100,
-            height=100
-        )
+        return f"{size}{color}{fill}{shape}"
     
-    def _update_available_pieces(self, game):
-        try:
-            if not self.window.winfo_exists():
-                return
-                
-            # Clear previous pieces
-            for button in self.piece_buttons:
-                if button.winfo_exists():
-                    button.destroy()
-            self.piece_buttons.clear()
-            
-            # Clear and reconfigure the scrollable frame
-            for widget in self.pieces_grid.winfo_children():
-                widget.destroy()
-            
-            # Configure the style for piece buttons
-            style = ttk.Style()
-            style.configure('Piece.TButton', 
-                          font=('TkDefaultFont', 12),
-                          padding=10)
-            
-            # Add available pieces as buttons in a 2-column grid
-            for i, piece in enumerate(game.available_pieces):
-                # Create frame for the button to ensure proper sizing
-                frame = ttk.Frame(self.pieces_grid)
-                frame.grid(row=i // 2, column=i % 2, pady=5, padx=5, sticky='nsew')
-                frame.grid_columnconfigure(0, weight=1)
-                
-                # Create button with piece symbols and description
-                symbols = self._get_piece_display(piece)
-                description = str(piece)
-                btn = ttk.Button(frame, 
-                               text=f"{symbols}\n{description}",
-                               style='Piece.TButton',
-                               width=15,
-                               state='normal' if self.pieces_enabled else 'disabled')
-                btn.pack(expand=True, fill=tk.BOTH)
-                
-                # Store the index for the lambda
-                idx = i
-                btn.config(command=lambda i=idx: self._on_piece_selected(i))
-                self.piece_buttons.append(btn)
-            
-            # Configure grid columns to be equal width
-            self.pieces_grid.update_idletasks()
-            
-        except tk.TclError:
-            # Window was destroyed
-            return
+    def _piece_button(self, piece):
+        """The button of `piece`, created the first time it is shown and kept after"""
+        button = self.piece_buttons.get(piece.code)
+        if button is not None:
+            return button
+        # Fixed slots in the order of a new game's pieces, two columns wide
+        slot = 15 - piece.code
+        frame = ttk.Frame(self.pieces_grid)
+        frame.grid(row=slot // 2, column=slot % 2, pady=5, padx=5, sticky='nsew')
+        frame.grid_columnconfigure(0, weight=1)
+        
+        # Create button with piece symbols and description
+        button = ttk.Button(frame,
+                            text=f"{self._get_piece_display(piece)}\n{piece}",
+                            style='Piece.TButton',
+                            width=15,
+                            command=lambda code=piece.code: self._on_piece_selected(code))
+        button.pack(expand=True, fill=tk.BOTH)
+        self.piece_buttons[piece.code] = button
+        return button
 
     def enable_piece_selection(self):
         """Enable piece selection buttons"""
         self.pieces_enabled = True
-        for btn in self.piece_buttons:
-            try:
-                if btn.winfo_exists():
-                    btn.configure(state='normal')
-            except tk.TclError:
-                continue
+        if self._game is not None:
+            self.update_board(self._game)
 
     def disable_piece_selection(self):
         """Disable piece selection buttons"""
         self.pieces_enabled = False
-        for btn in self.piece_buttons:
-            try:
-                if btn.winfo_exists():
-                    btn.configure(state='disabled')
-            except tk.TclError:
-                continue
+        if self._game is not None:
+            self.update_board(self._game)
+
+    def set_status(self, text):
+        try:
+            self.status_label.config(text=text)
+        except tk.TclError:
+            pass
 
-    def _on_piece_selected(self, index):
-        """Handle piece selection and generate event with piece index"""
+    def set_busy(self, busy):
+        """Show a busy cursor and lock piece selection while the AI thinks"""
+        try:
+            self.window.config(cursor='watch' if busy else '')
+        except tk.TclError:
+            return
+        if busy:
+            self.disable_piece_selection()
+
+    def _on_piece_selected(self, code):
+        """Handle piece selection and generate event with the piece's index in available_pieces"""
+        if not self.pieces_enabled:
+            # Disabled since the last redraw
+            return
+        index = [piece.code for piece in self._game.available_pieces].index(code)
         self.window.event_generate('<<PieceSelected>>', when='tail', state=index)
 
     def _get_piece_display(self, piece):
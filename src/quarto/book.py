@@ -0,0 +1,180 @@
+"""Opening book: deep-searched first moves, keyed by canonical position.
+
+The builder enumerates every position (up to symmetry) of the first plies,
+searches each one with AlphaBetaSearch and appends a fixed-size record per
+position to the book file. Records are appended as soon as they are found, so
+an interrupted build resumes where it stopped, and positions are searched in
+parallel across processes.
+
+Build one with:
+
+    python -m quarto.book --plies 3 --time 10 --workers 4
+"""
+import argparse
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
+from .state import GameState
+from .search import AlphaBetaSearch
+from .symmetry import canonicalize, unique_placements, unique_gives
+
+MAGIC = b'QOB1'
+# canonical key, cell, piece, score, completed depth, nodes searched
+_RECORD = struct.Struct('<11sBBhBI')
+_NONE = 0xFF
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), 'data', 'opening.qob')
+
+
+def opening_positions(plies):
+    """Canonical positions where a decision is due in the first `plies` moves.
+
+    A ply is a single decision: the opening give, or a placement together
+    with the give that follows it. Returns {canonical key: canonical state}.
+    """
+    positions = {}
+    frontier = [GameState()]
+    for ply in range(plies):
+        next_frontier = []
+        for state in frontier:
+            key, transform = canonicalize(state)
+            if key in positions:
+                continue
+            positions[key] = transform.apply(state)
+            next_frontier.extend(_successors(state))
+        frontier = next_frontier
+    return positions
+
+
+def _successors(state):
+    if state.in_hand is None:
+        for code in unique_gives(state):
+            child = state.copy()
+            child.give(code)
+            yield child
+        return
+    for cell in unique_placements(state):
+        child = state.copy()
+        if child.place(cell) or child.available == 0:
+            continue
+        for code in unique_gives(child):
+            grandchild = child.copy()
+            grandchild.give(code)
+            yield grandchild
+
+
+def _search_position(args):
+    """Worker: search one canonical position and return its record fields"""
+    key, state, time_limit = args
+    search = AlphaBetaSearch()
+    (cell, code), score = search.search(state, time_limit)
+    return key, cell, code, score, search.completed_depth, search.nodes
+
+
+def _read_records(path):
+    records = {}
+    if not os.path.exists(path):
+        return records
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an opening book file")
+        while True:
+            data = f.read(_RECORD.size)
+            if len(data) < _RECORD.size:
+                # A partial record is left by an interrupted build
+                break
+            raw_key, cell, code, score, depth, nodes = _RECORD.unpack(data)
+            records[int.from_bytes(raw_key, 'little')] = (
+                None if cell == _NONE else cell, None if code == _NONE else code,
+                score, depth, nodes)
+    return records
+
+
+def build_book(path, plies=3, time_limit=10, workers=None, progress=None):
+    """Search the opening positions that are not in the book yet.
+
+    Returns the number of positions added. `progress`, if given, is called
+    with (done, total) after each position.
+    """
+    existing = _read_records(path)
+    todo = [(key, state, time_limit)
+            for key, state in opening_positions(plies).items() if key not in existing]
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(path, 'ab') as f:
+        size = f.tell()
+        if size == 0:
+            f.write(MAGIC)
+        else:
+            # Drop a partial record left by an interrupted build
+            f.truncate(size - (size - len(MAGIC)) % _RECORD.size)
+            f.seek(0, os.SEEK_END)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for done, (key, cell, code, score, depth, nodes) in enumerate(
+                    executor.map(_search_position, todo), 1):
+                f.write(_RECORD.pack(key.to_bytes(11, 'little'),
+                                     _NONE if cell is None else cell,
+                                     _NONE if code is None else code,
+                                     score, depth, min(nodes, 0xFFFFFFFF)))
+                f.flush()
+                if progress:
+                    progress(done, len(todo))
+    return len(todo)
+
+
+class OpeningBook:
+    """Opening book read from disk on the first lookup"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._records = None
+
+    def _load(self):
+        if self._records is None:
+            try:
+                self._records = _read_records(self.path)
+            except (OSError, ValueError):
+                self._records = {}
+        return self._records
+
+    def __len__(self):
+        return len(self._load())
+
+    def lookup(self, state):
+        """Return (cell, code, score, depth, nodes) for `state`, or None.
+
+        cell is None for the opening give and code is None when the
+        placement ends the game; both are in the orientation of `state`.
+        """
+        records = self._load()
+        if not records:
+            return None
+        key, transform = canonicalize(state)
+        record = records.get(key)
+        if record is None:
+            return None
+        cell, code, score, depth, nodes = record
+        return (None if cell is None else transform.inverse_cell(cell),
+                None if code is None else transform.inverse_code(code),
+                score, depth, nodes)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or extend the Quarto opening book")
+    parser.add_argument('output', nargs='?', default=DEFAULT_PATH)
+    parser.add_argument('--plies', type=int, default=3,
+                        help="number of opening decisions to cover")
+    parser.add_argument('--time', type=float, default=10,
+                        help="seconds of search per position")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+    added = build_book(args.output, args.plies, args.time, args.workers,
+                       progress=lambda done, total: print(f"{done}/{total}", flush=True))
+    print(f"Added {added} positions to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
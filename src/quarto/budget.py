@@ -0,0 +1,77 @@
+"""Search budgets shared by all strategies, and phase-aware time management."""
+from time import time
+
+# Share of the base time per decision for each number of empty cells: little
+# in the opening, most in the middlegame and little again in the endgame,
+# which is searched to the end quickly
+PHASE_WEIGHTS = (0.1, 0.1, 0.1, 0.25, 0.5, 0.75, 1.0, 1.25, 1.5,
+                 1.5, 1.5, 1.5, 1.25, 1.0, 0.75, 0.5, 0.25)
+
+
+class SearchBudget:
+    """Limits of one search; whichever is reached first ends it.
+
+    `time` is in seconds of wall-clock time, `nodes` counts minimax nodes or
+    MCTS playouts and `memory` caps the bytes of the transposition table or
+    MCTS tree. Setting the `stop` event ends the search at once. Searches are
+    anytime: when the budget runs out they return the best result so far.
+    The deadline is fixed by started(), once per decision, so one budget can
+    be passed to many decisions.
+    """
+
+    def __init__(self, time=None, nodes=None, memory=None, stop=None, deadline=None):
+        self.time = time
+        self.nodes = nodes
+        self.memory = memory
+        self.stop = stop
+        self.deadline = deadline
+
+    @classmethod
+    def of(cls, budget):
+        """A started budget from a SearchBudget or a number of seconds"""
+        if not isinstance(budget, SearchBudget):
+            budget = cls(time=budget)
+        return budget.started()
+
+    @property
+    def unlimited(self):
+        return self.time is None and self.nodes is None and self.memory is None and self.stop is None
+
+    def started(self):
+        """This budget with its deadline counted from now, or itself if already started"""
+        if self.deadline is not None or self.time is None:
+            return self
+        return SearchBudget(self.time, self.nodes, self.memory, self.stop, time() + self.time)
+
+    def remaining(self):
+        """Seconds left before the deadline, or None without a time limit"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time())
+
+    def exhausted(self, nodes=0, memory=0):
+        """Whether a search that has used `nodes` and holds `memory` bytes must stop"""
+        return (self.deadline is not None and time() >= self.deadline or
+                self.nodes is not None and nodes >= self.nodes or
+                self.memory is not None and memory >= self.memory or
+                self.stop is not None and self.stop.is_set())
+
+    def share(self, workers):
+        """The budget of one of `workers` independent searches run in other processes.
+
+        They get the time left and an equal share of the nodes, but not the
+        stop event, which cannot be sent to another process. The share of a
+        budget that only the stop event limits is therefore unlimited.
+        """
+        nodes = None if self.nodes is None else -(-self.nodes // workers)
+        return SearchBudget(self.remaining(), nodes, self.memory)
+
+    def __repr__(self):
+        return (f"SearchBudget(time={self.time}, nodes={self.nodes}, memory={self.memory}, "
+                f"stop={self.stop is not None})")
+
+
+def phase_budget(state, seconds):
+    """A time budget of `seconds` scaled by the game phase of `state`"""
+    empty = bin(state.empty_mask).count('1')
+    return SearchBudget(time=seconds * PHASE_WEIGHTS[empty])
\ No newline at end of file
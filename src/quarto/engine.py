@@ -0,0 +1,157 @@
+"""Run an AIPlayer in a background process so that the GUI never waits for it.
+
+The worker process keeps one AIPlayer, with its MCTS tree and transposition
+table, for the whole game and answers one request at a time. The GUI calls
+poll() from a Tk `after` callback; nothing here blocks the caller. While a
+request is being answered the worker reports the live search counters every
+PROGRESS_INTERVAL seconds.
+"""
+import copy
+import multiprocessing
+import queue
+import signal
+import sys
+import threading
+from time import perf_counter, sleep
+
+from .ai_player import AIPlayer
+
+PROGRESS_INTERVAL = 0.1  # seconds between progress reports of the worker
+
+
+def _exit(signum, frame):
+    sys.exit(0)
+
+
+def _serve(requests, results, strategy, options):
+    """Worker process: answer requests until None arrives or the process is terminated"""
+    # Unwind on terminate so that the player can stop its own worker processes
+    signal.signal(signal.SIGTERM, _exit)
+    player = AIPlayer(strategy, **options)
+    current = None  # id of the request being answered
+
+    def report():
+        while True:
+            sleep(PROGRESS_INTERVAL)
+            request_id = current
+            if request_id is not None:
+                results.put(('progress', request_id, player.progress(), None))
+
+    threading.Thread(target=report, daemon=True).start()
+    try:
+        while True:
+            request = requests.get()
+            if request is None:
+                break
+            request_id, kind, game, budget = request
+            current = request_id
+            try:
+                if kind == 'move':
+                    choice, stats = player.make_move(game, with_stats=True, budget=budget)
+                else:
+                    choice, stats = player.select_piece(game, with_stats=True, budget=budget)
+                results.put(('done', request_id, choice, stats))
+            except Exception as e:
+                # Reported to the GUI, which would otherwise wait forever
+                results.put(('error', request_id, f"{type(e).__name__}: {e}", None))
+            current = None
+    finally:
+        player.close()
+
+
+class BackgroundEngine:
+    """An AIPlayer answering make_move and select_piece requests in a worker process.
+
+    request() returns at once; the answer is delivered to its callback by a
+    later poll(). Only one request is pending at a time. cancel() abandons it
+    by stopping the worker, and the next request starts a fresh player.
+    """
+
+    def __init__(self, strategy='simple', **options):
+        self.strategy = strategy
+        self.options = options  # AIPlayer keyword arguments
+        self._context = multiprocessing.get_context('spawn')
+        self._process = None
+        self._requests = None
+        self._results = None
+        self._next_id = 0
+        # (request id, on_done, on_progress, on_error, start time) or None
+        self._pending = None
+
+    @property
+    def busy(self):
+        return self._pending is not None
+
+    def start(self):
+        """Start the worker process now rather than on the first request"""
+        if self._process is not None:
+            return
+        self._requests = self._context.Queue()
+        self._results = self._context.Queue()
+        self._process = self._context.Process(
+            target=_serve, args=(self._requests, self._results, self.strategy, self.options),
+            name='quarto-engine')
+        self._process.start()
+
+    def request(self, kind, game, on_done, on_progress=None, on_error=None, budget=None):
+        """Ask for a 'move' or a 'piece' in `game`, within `budget` if given.
+
+        on_done is called with the answer of AIPlayer.make_move or
+        select_piece and its SearchStats, on_progress with the live search
+        counters and the seconds spent so far, and on_error with a message if
+        the worker fails.
+        """
+        if kind not in ('move', 'piece'):
+            raise ValueError(f"Unknown request '{kind}'")
+        if self.busy:
+            raise ValueError("The engine is already thinking")
+        if budget is not None and getattr(budget, 'stop', None) is not None:
+            # Events cannot be sent to another process; use cancel() instead
+            raise ValueError("The engine cannot use a budget with a stop event")
+        self.start()
+        self._next_id += 1
+        self._pending = (self._next_id, on_done, on_progress, on_error, perf_counter())
+        # Queues pickle in a background thread, so send a copy the GUI cannot change
+        self._requests.put((self._next_id, kind, copy.deepcopy(game), budget))
+
+    def poll(self):
+        """Deliver the messages that have arrived from the worker, without waiting"""
+        while self._results is not None and self._pending is not None:
+            try:
+                message = self._results.get_nowait()
+            except queue.Empty:
+                break
+            kind, request_id, value, stats = message
+            pending_id, on_done, on_progress, on_error, start = self._pending
+            if request_id != pending_id:
+                continue
+            if kind == 'progress':
+                if on_progress:
+                    on_progress(value, perf_counter() - start)
+            elif kind == 'done':
+                self._pending = None
+                on_done(value, stats)
+            else:
+                self._pending = None
+                if on_error:
+                    on_error(value)
+        if self._pending is not None and not self._process.is_alive():
+            on_error = self._pending[3]
+            self._pending = None
+            self._process = None
+            if on_error:
+                on_error("The engine process stopped unexpectedly")
+
+    def cancel(self):
+        """Abandon the pending request and stop the worker process"""
+        process, busy = self._process, self.busy
+        self._process = None
+        self._pending = None
+        if process is None:
+            return
+        if busy:
+            process.terminate()
+        else:
+            self._requests.put(None)
+        # Not joined: a stopping worker finishes on its own without holding up the GUI
+        self._requests = self._results = None
\ No newline at end of file
@@ -0,0 +1,257 @@
+import json
+import os
+import random
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from time import time
+
+import numpy as np
+
+from .state import GameState
+
+FITNESS_GAMES = 5  # games played to evaluate an individual
+MATCH_GAMES = 200  # games of a head-to-head match between two genomes
+OPENING_PLACEMENTS = 4  # random placements that open every match game
+# Head-to-head score a new genome needs to replace the one being played
+SWAP_SCORE = 0.55
+GENES = 32
+# Bump when the meaning of the genes changes, so that cached genomes are retrained
+GENOME_VERSION = 2
+DEFAULT_GENOME_PATH = os.path.join(os.path.dirname(__file__), 'data', 'genome.json')
+
+
+class Individual:
+    """A genome and its fitness: 16 piece preferences followed by 16 cell preferences"""
+
+    def __init__(self, strategy_genes=None):
+        if strategy_genes is None:
+            # Initialize random genes for piece selection and placement
+            self.strategy_genes = np.random.random(GENES)
+        else:
+            self.strategy_genes = strategy_genes
+        self.fitness = 0
+
+
+def random_population(size, rng=None):
+    """A (size, GENES) matrix of random genomes, one per row"""
+    rng = rng if rng is not None else np.random.default_rng()
+    return rng.random((size, GENES))
+
+
+def tournament_select(fitness, count, tournament_size, rng):
+    """Indices of `count` tournament winners, each the fittest of tournament_size random rows"""
+    contestants = rng.integers(0, len(fitness), (count, tournament_size))
+    return contestants[np.arange(count), fitness[contestants].argmax(axis=1)]
+
+
+def breed(population, fitness, tournament_size=5, mutation_rate=0.1, rng=None):
+    """The next generation: uniform crossover of tournament winners, then mutation"""
+    rng = rng if rng is not None else np.random.default_rng()
+    size = len(population)
+    parents1 = population[tournament_select(fitness, size, tournament_size, rng)]
+    parents2 = population[tournament_select(fitness, size, tournament_size, rng)]
+    children = np.where(rng.random(population.shape) < 0.5, parents1, parents2)
+    mutations = rng.random(population.shape) < mutation_rate
+    children[mutations] = rng.random(np.count_nonzero(mutations))
+    return children
+
+
+def _placement_flags(state):
+    """(wins, opens) over the cells: placing there wins, or leaves the opponent a win"""
+    state = state.copy()
+    wins = np.zeros(16, dtype=bool)
+    opens = np.zeros(16, dtype=bool)
+    for cell in state.empty_cells():
+        if state.push_place(cell):
+            wins[cell] = True
+        else:
+            opens[cell] = creates_winning_opportunity(state)
+        state.pop()
+    return wins, opens
+
+
+def _mask_vector(mask):
+    return (mask >> np.arange(16)) & 1 == 1
+
+
+def select_piece(state, genes):
+    """Use evolved strategy to select a piece"""
+    if not state.available:
+        return None
+    # The first 16 genes score the pieces, one per piece code; a piece the
+    # opponent can win with is avoided whenever there is another one
+    scores = genes[:16] - _mask_vector(state.poison)
+    return int(np.where(_mask_vector(state.available), scores, -np.inf).argmax())
+
+
+def make_move(state, genes):
+    """Use evolved strategy to make a move"""
+    empty = state.empty_mask
+    if not empty:
+        return None
+    # The last 16 genes score the cells
+    wins, opens = _placement_flags(state)
+    scores = genes[16:] + wins - 0.5 * opens
+    return int(np.where(_mask_vector(empty), scores, -np.inf).argmax())
+
+
+def creates_winning_opportunity(state):
+    """Check if the move creates a winning opportunity for the opponent"""
+    return state.poison != 0
+
+
+def play_game(genes, rng=random):
+    """Play a game using the evolved strategy `genes`.
+
+    The individual plays as player 0 against random moves and the result is
+    1 for a win, -1 for a loss and 0 for a draw.
+    """
+    state = GameState()
+    while not state.is_game_over():
+        # The player who gives the piece is the one who does not place it
+        giver = 1 - state.current_player
+        if giver == 0:
+            piece = select_piece(state, genes)
+        else:
+            piece = rng.choice(state.available_codes())
+        state.give(piece)
+
+        if state.current_player == 0:
+            cell = make_move(state, genes)
+        else:
+            cell = rng.choice(state.empty_cells())
+        if state.place(cell):
+            return 1 if state.current_player == 1 else -1
+
+    return 0  # Draw if game ends without winning
+
+
+def head_to_head(genes, opponent, seed=None, games=MATCH_GAMES):
+    """Score of `genes` against `opponent`: the fraction of `games` won, draws counting half.
+
+    Good genomes soon win every fitness game against random play, so this
+    is how two of them are told apart. Every game opens with
+    OPENING_PLACEMENTS random placements, so that the deterministic genomes
+    play different games, and each opening is played twice with the seats
+    swapped; equal genomes score exactly 0.5.
+    """
+    rng = random.Random(seed)
+    score = 0.0
+    for _ in range(games // 2):
+        opening = rng.random()
+        score += (_play_match_game((genes, opponent), random.Random(opening)) + 1) / 2
+        score += (1 - _play_match_game((opponent, genes), random.Random(opening))) / 2
+    return score / (games // 2 * 2)
+
+
+def _play_match_game(players, rng):
+    """1, -1 or 0 for a win, loss or draw of players[0], who places first"""
+    state = GameState()
+    placements = 0
+    while not state.is_game_over():
+        opening = placements < OPENING_PLACEMENTS
+        giver = 1 - state.current_player
+        if opening:
+            state.give(rng.choice(state.available_codes()))
+        else:
+            state.give(select_piece(state, players[giver]))
+        placer = state.current_player
+        if opening:
+            cell = rng.choice(state.empty_cells())
+        else:
+            cell = make_move(state, players[placer])
+        placements += 1
+        if state.place(cell):
+            return 1 if placer == 0 else -1
+    return 0
+
+
+def evaluate(genes, seed, games=FITNESS_GAMES):
+    """Fitness of `genes`: the fraction of `games` won, reproducible from `seed`"""
+    rng = random.Random(seed)
+    wins = sum(play_game(genes, rng) == 1 for _ in range(games))
+    return wins / games
+
+
+def _evaluate_worker(args):
+    """Process pool entry point"""
+    return evaluate(*args)
+
+
+def evolve(population, generations, tournament_size=5, workers=None, seed=None,
+           progress=None, stop=None, mutation_rate=0.1):
+    """Evolve the genome matrix `population`; returns (final population, best individual).
+
+    Fitness evaluation is spread over `workers` processes (default: one per
+    CPU; 1 evaluates in this process). Every genome plays its games with its
+    own seed drawn from `seed`, which also drives selection and mutation, so
+    results do not depend on how the work is scheduled. `progress`, if given,
+    is called after each generation with (generation, best individual, mean
+    fitness, seconds). Evolution ends early once the `stop` event, if given,
+    is set.
+    """
+    workers = workers or os.cpu_count() or 1
+    rng = np.random.default_rng(seed)
+    best_individual = None
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for generation in range(generations):
+            if stop is not None and stop.is_set():
+                break
+            start = time()
+            # Evaluate fitness for each genome
+            jobs = [(genes, int(seed)) for genes, seed in
+                    zip(population, rng.integers(0, 1 << 63, len(population)))]
+            if executor is None:
+                fitness = list(map(_evaluate_worker, jobs))
+            else:
+                fitness = list(executor.map(_evaluate_worker, jobs,
+                                            chunksize=max(1, len(jobs) // (workers * 4))))
+            fitness = np.array(fitness)
+
+            best = int(fitness.argmax())
+            best_individual = Individual(population[best].copy())
+            best_individual.fitness = float(fitness[best])
+            if progress:
+                progress(generation, best_individual, float(fitness.mean()), time() - start)
+            population = breed(population, fitness, tournament_size, mutation_rate, rng)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return population, best_individual
+
+
+def save_genome(path, individual):
+    """Write the genes and fitness of `individual` to the genome cache at `path`"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # A temporary file of our own, so that processes saving at the same time
+    # cannot write into each other's; readers never see a partly written cache
+    handle, temporary = tempfile.mkstemp(suffix='.tmp', dir=directory or '.')
+    try:
+        with os.fdopen(handle, 'w') as f:
+            json.dump({'version': GENOME_VERSION,
+                       'genes': [float(gene) for gene in individual.strategy_genes],
+                       'fitness': individual.fitness}, f)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def load_genome(path):
+    """The Individual cached at `path`, or None if missing, unreadable or outdated"""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get('version') != GENOME_VERSION:
+        return None
+    genes = data.get('genes')
+    if not isinstance(genes, list) or len(genes) != 32:
+        return None
+    individual = Individual(np.array(genes, dtype=float))
+    individual.fitness = data.get('fitness', 0)
+    return individual
\ No newline at end of file
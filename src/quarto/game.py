@@ -8,6 +8,7 @@ class Game:
         self.available_pieces = self._create_pieces()
         self.selected_piece = None
         self.current_player = 0  # 0 or 1
+        self._undo_stack = []  # entries pushed by push_select/push_place
         
     def _create_pieces(self):
         pieces = []
@@ -22,39 +23,58 @@ class Game:
         self.selected_piece = self.available_pieces.pop(piece_index)
         
     def place_selected_piece(self, row, col):
+        """Place the selected piece and return True if it won the game"""
         if self.selected_piece is None:
             raise ValueError("No piece selected")
-        self.board.place_piece(self.selected_piece, row, col)
+        won = self.board.place_piece(self.selected_piece, row, col)
         self.selected_piece = None
         self.current_player = 1 - self.current_player  # Switch players
+        return won
+        
+    def legal_placements(self):
+        """Cells where the selected piece can go; empty when no piece is selected"""
+        if self.selected_piece is None:
+            return []
+        return self.board.empty_cells()
+        
+    def legal_gives(self):
+        """Indices of the pieces that can be selected for the next placement"""
+        if self.selected_piece is not None:
+            return []
+        return list(range(len(self.available_pieces)))
+        
+    def push_select(self, piece_index):
+        """Select a piece like select_piece, recording it so pop() can undo it"""
+        previous = self.selected_piece
+        self.select_piece(piece_index)
+        self._undo_stack.append(('select', piece_index, previous))
+        
+    def push_place(self, row, col):
+        """Place the selected piece like place_selected_piece, recording it for pop()"""
+        piece = self.selected_piece
+        player = self.current_player
+        won = self.place_selected_piece(row, col)
+        self._undo_stack.append(('place', (row, col), piece, player))
+        return won
+        
+    def pop(self):
+        """Undo the most recent push_select or push_place"""
+        if not self._undo_stack:
+            raise ValueError("No move to undo")
+        entry = self._undo_stack.pop()
+        if entry[0] == 'select':
+            _, piece_index, previous = entry
+            self.available_pieces.insert(piece_index, self.selected_piece)
+            self.selected_piece = previous
+        else:
+            _, (row, col), piece, player = entry
+            self.board.remove_piece(row, col)
+            self.selected_piece = piece
+            self.current_player = player
         
     def check_win(self):
-        # Check all rows, columns, and diagonals
-        for i in range(4):
-            # Check rows
-            if self._check_line([self.board.get_piece(i, j) for j in range(4)]):
-                return True
-            # Check columns
-            if self._check_line([self.board.get_piece(j, i) for j in range(4)]):
-                return True
-                
-        # Check diagonals
-        if self._check_line([self.board.get_piece(i, i) for i in range(4)]):
-            return True
-        if self._check_line([self.board.get_piece(i, 3-i) for i in range(4)]):
-            return True
-            
-        return False
-        
-    def _check_line(self, pieces):
-        if None in pieces:
-            return False
-        # Check each attribute
-        for attr in ['height', 'solidity', 'shape', 'color']:
-            if all(getattr(p, attr) for p in pieces) or \
-               not any(getattr(p, attr) for p in pieces):
-                return True
-        return False
+        # Winning lines are tracked by the board as pieces are placed
+        return self.board.check_win()
         
     def is_game_over(self):
         return self.check_win() or self.board.is_full()
\ No newline at end of file
@@ -1,9 +1,11 @@
 from .game import Game
-from .ai_player import AIPlayer
+from .engine import BackgroundEngine
 from .board_gui import BoardGUI, StartForm
 from tkinter import messagebox
 import logging
 
+POLL_INTERVAL = 15  # milliseconds between checks for engine results, about a frame
+
 def setup_debug_logger():
     logger = logging.getLogger('quarto_debug')
     logger.setLevel(logging.DEBUG)
@@ -34,21 +36,39 @@ def main():
     
     debug_logger.debug(f"Game started with AI mode: {selected_mode}")
     
-    # Create game instances
+    # Create game instances; the AI player runs in a background process and
+    # ponders while the human thinks
     game = Game()
-    ai_player = AIPlayer(strategy=selected_mode)
+    engine = BackgroundEngine(selected_mode, ponder=True)
+    engine.start()
     board_gui = BoardGUI()
     
     # Initial board update to show available pieces
     board_gui.update_board(game)
-
+    
+    def think(kind, on_done):
+        """Ask the engine for a move or a piece, locking input until it answers"""
+        board_gui.set_busy(True)
+        board_gui.set_status("AI is thinking...")
+        engine.request(kind, game, on_done, on_progress=show_progress, on_error=on_engine_error)
+    
+    def show_progress(progress, elapsed):
+        board_gui.set_status(f"AI is thinking... {elapsed:.1f}s, {progress['nodes']} nodes, "
+                             f"{progress['playouts']} playouts, depth {progress['depth']}")
+    
+    def on_engine_error(message):
+        board_gui.set_busy(False)
+        board_gui.set_status("")
+        debug_logger.error(f"Engine error: {message}")
+        messagebox.showerror("Error", message)
+    
     def on_piece_selected(event):
         try:
             # Only allow piece selection if no piece is currently selected
-            if game.selected_piece is not None:
+            if game.selected_piece is not None or engine.busy:
                 debug_logger.debug("Piece already selected - ignoring selection")
                 return
-
+            
             index = event.state
             selected_piece = game.available_pieces[index]
             debug_logger.debug(f"\nHuman selected piece for AI: {selected_piece}")
@@ -57,40 +77,63 @@ def main():
             game.select_piece(index)
             board_gui.update_board(game)
             
-            # AI immediately places the piece
-            row, col = ai_player.make_move(game)
-            debug_logger.debug(f"AI placed piece at position: ({row}, {col})")
+            # AI places the piece once the engine has decided
+            think('move', on_ai_move)
+        
+        except ValueError as e:
+            debug_logger.error(f"Error: {str(e)}")
+            messagebox.showerror("Error", str(e))
+    
+    def on_ai_move(move, stats):
+        try:
+            row, col = move
+            debug_logger.debug(f"AI placed piece at position: ({row}, {col}) - {stats}")
             game.place_selected_piece(row, col)
             board_gui.update_board(game)
             
             if game.check_win():
                 debug_logger.debug("Game Over - AI wins!")
+                board_gui.set_busy(False)
+                board_gui.set_status("")
                 board_gui.show_game_over("AI")
                 return
             elif game.board.is_full():
                 debug_logger.debug("Game Over - Draw!")
+                board_gui.set_busy(False)
+                board_gui.set_status("")
                 board_gui.show_draw()
                 return
             
             # AI selects a piece for the human
-            piece_idx = ai_player.select_piece(game)
+            think('piece', on_ai_piece)
+        
+        except ValueError as e:
+            debug_logger.error(f"Error: {str(e)}")
+            messagebox.showerror("Error", str(e))
+    
+    def on_ai_piece(piece_idx, stats):
+        try:
             selected_piece = game.available_pieces[piece_idx]
-            debug_logger.debug(f"AI selected piece for Human: {selected_piece}")
+            debug_logger.debug(f"AI selected piece for Human: {selected_piece} - {stats}")
             game.select_piece(piece_idx)
             board_gui.update_board(game)
+            board_gui.set_busy(False)
             # Disable piece selection until human places their piece
             board_gui.disable_piece_selection()
-            messagebox.showinfo("AI's Turn", "AI has placed its piece and selected a piece for you.\nNow place this piece on the board.")
-            
+            board_gui.set_status("AI has selected a piece for you. Now place this piece on the board.")
+        
         except ValueError as e:
             debug_logger.error(f"Error: {str(e)}")
             messagebox.showerror("Error", str(e))
     
     def on_board_click(row, col):
+        if engine.busy:
+            debug_logger.debug("AI is thinking - ignoring click")
+            return
         if game.selected_piece is None:
             debug_logger.debug("No piece selected yet")
             return
-            
+        
         try:
             debug_logger.debug(f"\nHuman placing piece at position: ({row}, {col})")
             # Human places their piece
@@ -99,38 +142,54 @@ def main():
             
             if game.check_win():
                 debug_logger.debug("Game Over - Human wins!")
+                board_gui.set_status("")
                 board_gui.show_game_over("Human")
                 return
             elif game.board.is_full():
                 debug_logger.debug("Game Over - Draw!")
+                board_gui.set_status("")
                 board_gui.show_draw()
                 return
-                
+            
             debug_logger.debug("Human's turn complete - enabling piece selection for AI")
             # Now enable piece selection for AI
             board_gui.enable_piece_selection()
-            messagebox.showinfo("Your Turn", "Now select a piece for the AI to place.")
-                
+            board_gui.set_status("Now select a piece for the AI to place.")
+        
         except ValueError as e:
             debug_logger.error(f"Error: {str(e)}")
             messagebox.showerror("Error", str(e))
     
+    def on_new_game(event):
+        nonlocal game
+        debug_logger.debug("\nNew game - cancelling the AI")
+        # Stops the engine mid-search if needed; a fresh AI player starts with the game
+        engine.cancel()
+        game = Game()
+        board_gui.update_board(game)
+        start_game()
+    
+    def start_game():
+        debug_logger.debug("Game initialized - waiting for first move")
+        # Start the game by having AI select first piece for human
+        think('piece', on_ai_piece)
+    
+    def poll_engine():
+        engine.poll()
+        board_gui.window.after(POLL_INTERVAL, poll_engine)
+    
     # Connect GUI events
     board_gui.canvas.bind('<Button-1>', lambda e: on_board_click(e.y // 120, e.x // 120))
     board_gui.window.bind('<<PieceSelected>>', on_piece_selected)
+    board_gui.window.bind('<<NewGame>>', on_new_game)
     
-    # Show initial instruction
-    debug_logger.debug("Game initialized - waiting for first move")
-    # Start the game by having AI select first piece for human
-    piece_idx = ai_player.select_piece(game)
-    selected_piece = game.available_pieces[piece_idx]
-    debug_logger.debug(f"AI selected initial piece for Human: {selected_piece}")
-    game.select_piece(piece_idx)
-    board_gui.update_board(game)
-    board_gui.disable_piece_selection()  # Disable piece selection until first piece is placed
-    messagebox.showinfo("Game Start", "Place your piece on the board.")
-    
-    board_gui.window.mainloop()
+    start_game()
+    poll_engine()
+    try:
+        board_gui.window.mainloop()
+    finally:
+        # Quitting while the AI thinks stops its search
+        engine.cancel()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
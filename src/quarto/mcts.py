@@ -0,0 +1,393 @@
+import math
+import random
+import threading
+from array import array
+
+import numpy as np
+
+from .board import mask_bits
+from .budget import SearchBudget
+from .symmetry import unique_placements, unique_gives
+from .playout import random_playout, batch_playouts
+
+EXPLORATION = math.sqrt(2)
+# Losses temporarily added along a path while a playout is in flight, so that
+# concurrent workers are steered to different branches
+VIRTUAL_LOSS = 1
+# Our placement and give followed by the opponent's
+REUSE_DEPTH = 4
+NO_NODE = -1
+
+
+def deciding_player(state):
+    """The player to decide in `state`: the placer, or the giver when no piece is in hand"""
+    return state.current_player if state.in_hand is not None else 1 - state.current_player
+
+
+def legal_actions(state, root=False):
+    """The actions available in `state`: cells to place on, or codes to give.
+
+    A node with a piece in hand decides where to place it and a node without
+    one decides which piece to give, so the tree alternates between the two.
+    A winning placement is returned alone and poison pieces are only given
+    when nothing else is left. At the root, symmetric duplicates are removed.
+    """
+    if state.won or state.is_full():
+        return []
+    if state.in_hand is None:
+        codes = unique_gives(state) if root else list(state.legal_gives())
+        # Giving a poison piece loses at once; only consider it when forced
+        safe = [code for code in codes if not state.poison >> code & 1]
+        return safe or codes
+    if state.can_win():
+        return [state.winning_cell()]
+    return unique_placements(state) if root else list(state.legal_placements())
+
+
+def action_mask(state, root=False):
+    """legal_actions as a 16-bit mask"""
+    mask = 0
+    for action in legal_actions(state, root):
+        mask |= 1 << action
+    return mask
+
+
+def apply_action(state, action):
+    if state.in_hand is None:
+        state.give(action)
+    else:
+        state.place(action)
+
+
+class NodePool:
+    """MCTS nodes stored column-wise in preallocated typed arrays.
+
+    A node is an index. Children form a linked list through first_child and
+    next_sibling, and a node stores the action on its incoming edge but not
+    its position, which is rebuilt by replaying actions from the root. A node
+    costs NODE_BYTES bytes; the arrays double when full.
+    """
+    __slots__ = ('parent', 'first_child', 'next_sibling', 'action', 'player',
+                 'untried', 'visits', 'wins', 'size', 'capacity', 'grows')
+
+    _COLUMNS = (('parent', 'i'), ('first_child', 'i'), ('next_sibling', 'i'),
+                ('action', 'b'),  # cell or piece code on the edge from the parent
+                ('player', 'b'),  # the player who chose the action
+                ('untried', 'H'),  # mask of actions without a child yet
+                ('visits', 'i'), ('wins', 'i'))
+    NODE_BYTES = sum(array(typecode).itemsize for _, typecode in _COLUMNS)
+
+    def __init__(self, capacity=1 << 12):
+        for name, typecode in self._COLUMNS:
+            setattr(self, name, array(typecode, bytes(capacity * array(typecode).itemsize)))
+        self.size = 0
+        self.capacity = capacity
+        self.grows = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, parent, action, player, untried):
+        """Append a node, link it under `parent` and return its index"""
+        if self.size == self.capacity:
+            self._grow()
+        index = self.size
+        self.size += 1
+        self.parent[index] = parent
+        self.first_child[index] = NO_NODE
+        self.action[index] = action
+        self.player[index] = player
+        self.untried[index] = untried
+        self.visits[index] = 0
+        self.wins[index] = 0
+        if parent == NO_NODE:
+            self.next_sibling[index] = NO_NODE
+        else:
+            self.next_sibling[index] = self.first_child[parent]
+            self.first_child[parent] = index
+        return index
+
+    def _grow(self):
+        for name, typecode in self._COLUMNS:
+            getattr(self, name).frombytes(bytes(self.capacity * array(typecode).itemsize))
+        self.capacity *= 2
+        self.grows += 1
+
+    def children(self, index):
+        child = self.first_child[index]
+        while child != NO_NODE:
+            yield child
+            child = self.next_sibling[child]
+
+    def child(self, index, action):
+        for child in self.children(index):
+            if self.action[child] == action:
+                return child
+        return NO_NODE
+
+    def stats(self):
+        return {'nodes': self.size, 'capacity': self.capacity,
+                'bytes': self.capacity * self.NODE_BYTES, 'grows': self.grows}
+
+
+class MCTS:
+    """Tree-parallel Monte Carlo tree search over placements and gives.
+
+    Nodes alternate between placing the piece in hand and giving a piece,
+    each edge labelled with its cell or piece code, so the search for a move
+    also explores the give that follows it and one tree answers both
+    make_move and the next select_piece. Nodes live in a NodePool and each
+    iteration rebuilds the position of the selected leaf by replaying the
+    actions from the root position.
+
+    Several threads share one tree. Selection and expansion happen under a
+    lock and apply a virtual loss along the chosen path, the playout runs
+    outside it, and the result replaces the virtual loss on the way back up.
+    With playout_batch > 1 each new leaf is evaluated by that many playouts
+    at once with the NumPy batch engine instead of a single Python playout.
+    The tree is kept between searches: when the next search starts from a
+    position already in the tree (normally after our placement and give and
+    the opponent's), that subtree is copied into a fresh pool and becomes the
+    new root together with its statistics.
+    """
+    ROOT = 0
+
+    def __init__(self, threads=1, exploration=EXPLORATION, virtual_loss=VIRTUAL_LOSS,
+                 playout_batch=1):
+        self.threads = threads
+        self.playout_batch = playout_batch
+        self.exploration = exploration
+        self.virtual_loss = virtual_loss
+        self.pool = None
+        self.root_state = None
+        self.playouts = 0
+        self.nodes_added = 0
+        self.max_depth = 0  # deepest node selected in the last search
+        self.reused_visits = 0  # root child visits carried over from earlier searches
+        self._lock = threading.Lock()
+
+    def search(self, state, budget, rng=random):
+        """Search from `state` until the budget runs out and return the root statistics.
+
+        `budget` is a SearchBudget, whose nodes are playouts and whose memory
+        is the node pool, or a number of seconds. The result is {action:
+        (visits, wins)} for the root children, with wins (minus losses)
+        counted for the player deciding in `state`.
+        """
+        budget = SearchBudget.of(budget)
+        if budget.unlimited:
+            raise ValueError("MCTS needs a limited budget")
+        self._set_root(state)
+        self.playouts = 0
+        self.max_depth = 0
+        start_size = len(self.pool)
+        self.reused_visits = sum(self.pool.visits[child] for child in self.pool.children(self.ROOT))
+        if not self.pool.untried[self.ROOT] and self.pool.first_child[self.ROOT] == NO_NODE:
+            return {}
+        seeds = [rng.getrandbits(64) for _ in range(self.threads)]
+        if self.threads == 1:
+            self._work(budget, random.Random(seeds[0]))
+        else:
+            workers = [threading.Thread(target=self._work, args=(budget, random.Random(seed)))
+                       for seed in seeds]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        self.nodes_added = len(self.pool) - start_size
+        return self.root_stats()
+
+    def root_stats(self):
+        pool = self.pool
+        return {pool.action[child]: (pool.visits[child], pool.wins[child])
+                for child in pool.children(self.ROOT)}
+
+    def best_reply(self, action):
+        """The most visited action after the root `action`, or None if unexplored.
+
+        After choosing a placement this is the give decided by the same search.
+        """
+        if self.pool is None:
+            return None
+        pool = self.pool
+        child = pool.child(self.ROOT, action)
+        if child == NO_NODE or pool.first_child[child] == NO_NODE:
+            return None
+        return pool.action[max(pool.children(child), key=lambda reply: pool.visits[reply])]
+
+    def principal_variation(self, action=None, max_length=16):
+        """The actions from the root following the most visited child at each node.
+
+        With `action`, the line starts with that root action instead.
+        """
+        line = []
+        pool = self.pool
+        node = self.ROOT
+        if action is not None and pool is not None:
+            line.append(action)
+            node = pool.child(self.ROOT, action)
+            if node == NO_NODE:
+                return tuple(line)
+        while pool is not None and len(line) < max_length and pool.first_child[node] != NO_NODE:
+            node = max(pool.children(node), key=lambda child: pool.visits[child])
+            line.append(pool.action[node])
+        return tuple(line)
+
+    def _set_root(self, state):
+        """Reuse the subtree for `state` if it is within REUSE_DEPTH actions of the root"""
+        node = self._find(state)
+        if node == self.ROOT:
+            return
+        if node != NO_NODE:
+            self.pool = self._copy_subtree(node)
+        else:
+            self.pool = NodePool()
+            self.pool.add(NO_NODE, -1, 0, action_mask(state, root=True))
+        self.root_state = state.copy()
+
+    def _find(self, state):
+        if self.pool is None:
+            return NO_NODE
+        pool = self.pool
+        frontier = [(self.ROOT, self.root_state)]
+        for _ in range(REUSE_DEPTH + 1):
+            next_frontier = []
+            for node, node_state in frontier:
+                if node_state.key == state.key:
+                    return node
+                for child in pool.children(node):
+                    child_state = node_state.copy()
+                    apply_action(child_state, pool.action[child])
+                    # Only positions whose pieces are all on the target board lead to it
+                    if not child_state.occupied & ~state.occupied:
+                        next_frontier.append((child, child_state))
+            frontier = next_frontier
+        return NO_NODE
+
+    def _copy_subtree(self, node):
+        """A new pool holding the subtree under `node`, which becomes its root"""
+        old = self.pool
+        pool = NodePool()
+        frontier = [(node, NO_NODE)]
+        while frontier:
+            next_frontier = []
+            for old_index, new_parent in frontier:
+                index = pool.add(new_parent, old.action[old_index], old.player[old_index],
+                                 old.untried[old_index])
+                pool.visits[index] = old.visits[old_index]
+                pool.wins[index] = old.wins[old_index]
+                next_frontier.extend((child, index) for child in old.children(old_index))
+            frontier = next_frontier
+        return pool
+
+    def _work(self, budget, rng):
+        batch_rng = np.random.default_rng(rng.getrandbits(64))
+        while not budget.exhausted(self.playouts, self.pool.capacity * NodePool.NODE_BYTES):
+            with self._lock:
+                leaf, state = self._select_and_expand(rng)
+            playouts, wins = self._evaluate(state, rng, batch_rng)
+            with self._lock:
+                self._backpropagate(leaf, playouts, wins)
+                self.playouts += playouts
+
+    def _select_and_expand(self, rng):
+        """Walk down by UCT, add one child and apply the virtual loss to the path.
+
+        Returns the new leaf and its position.
+        """
+        pool = self.pool
+        visits, wins, action = pool.visits, pool.wins, pool.action
+        exploration = self.exploration
+        state = self.root_state.copy()
+        node = self.ROOT
+        depth = 0
+        while not pool.untried[node] and pool.first_child[node] != NO_NODE:
+            log_visits = math.log(visits[node])
+            node = max(pool.children(node), key=lambda child:
+                       wins[child] / visits[child] +
+                       exploration * math.sqrt(log_visits / visits[child]))
+            apply_action(state, action[node])
+            depth += 1
+        if pool.untried[node]:
+            chosen = rng.choice(mask_bits(pool.untried[node]))
+            pool.untried[node] &= ~(1 << chosen)
+            player = deciding_player(state)
+            apply_action(state, chosen)
+            node = pool.add(node, chosen, player, action_mask(state))
+            depth += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+        leaf = node
+        while node != NO_NODE:
+            visits[node] += self.virtual_loss
+            wins[node] -= self.virtual_loss
+            node = pool.parent[node]
+        return leaf, state
+
+    def _evaluate(self, state, rng, batch_rng):
+        """Play out `state`; returns (playouts, (wins of player 0, wins of player 1))"""
+        if self.playout_batch == 1:
+            winner = random_playout(state, rng)
+            return 1, (int(winner == 0), int(winner == 1))
+        winners = batch_playouts(state, self.playout_batch, batch_rng)
+        return self.playout_batch, (int(np.count_nonzero(winners == 0)),
+                                    int(np.count_nonzero(winners == 1)))
+
+    def _backpropagate(self, node, playouts, wins):
+        """Replace the virtual loss with the playout results up the path"""
+        pool = self.pool
+        while node != NO_NODE:
+            pool.visits[node] += playouts - self.virtual_loss
+            pool.wins[node] += self.virtual_loss
+            if node != self.ROOT:
+                player = pool.player[node]
+                pool.wins[node] += wins[player] - wins[1 - player]
+            node = pool.parent[node]
+
+
+def run_search(state, budget, seed=None, playout_batch=1):
+    """Search a fresh single-threaded tree; returns {action: (visits, wins)}"""
+    return MCTS(playout_batch=playout_batch).search(state, budget, random.Random(seed))
+
+
+def _search_worker(args):
+    """Process pool entry point: one independent tree per call"""
+    return run_search(*args)
+
+
+def merge_root_stats(results):
+    """Sum the per-action (visits, wins) of several independent searches"""
+    merged = {}
+    for stats in results:
+        for action, (visits, wins) in stats.items():
+            total_visits, total_wins = merged.get(action, (0, 0))
+            merged[action] = (total_visits + visits, total_wins + wins)
+    return merged
+
+
+def root_parallel_search(state, budget, workers=1, executor=None, rng=random, tree=None):
+    """Root-parallel MCTS: independently seeded trees, merged at the root.
+
+    `tree` (a persistent MCTS, by default a fresh one) is searched in this
+    process. With an executor (normally a ProcessPoolExecutor) another
+    `workers - 1` trees are searched concurrently in it, each with the time
+    left and an equal share of the playouts of `budget` (a SearchBudget or
+    seconds), and their root statistics are added to the local ones. A stop
+    event cannot reach them, so a budget that no other limit ends is
+    rejected before anything is searched.
+    """
+    tree = tree or MCTS()
+    budget = SearchBudget.of(budget)
+    if executor is None or workers <= 1:
+        return tree.search(state, budget, rng)
+    share = budget.share(workers)
+    if share.unlimited:
+        raise ValueError("Root-parallel MCTS needs a time, playout or memory limit; "
+                         "a stop event cannot end searches in other processes")
+    jobs = [(state, share, rng.getrandbits(64), tree.playout_batch)
+            for _ in range(workers - 1)]
+    remote = executor.map(_search_worker, jobs)
+    local = tree.search(state, SearchBudget(budget.time, share.nodes, budget.memory,
+                                            budget.stop, budget.deadline), rng)
+    return merge_root_stats([local, *remote])
\ No newline at end of file
@@ -13,6 +13,17 @@ class Piece:
         attrs.append('d' if self.color else 'l')
         return '-'.join(attrs)
     
+    @property
+    def code(self):
+        """4-bit attribute code: one bit per attribute, set when True"""
+        return (int(self.height) | int(self.solidity) << 1 |
+                int(self.shape) << 2 | int(self.color) << 3)
+    
+    @classmethod
+    def from_code(cls, code):
+        """Build the piece described by a 4-bit attribute code"""
+        return cls(bool(code & 1), bool(code & 2), bool(code & 4), bool(code & 8))
+    
     def shares_attribute(self, other):
         if other is None:
             return False
@@ -0,0 +1,146 @@
+"""Random playouts, one at a time or thousands at once in NumPy arrays.
+
+The batch engine plays `n` independent random games from the same position
+in lockstep: every step places the piece in hand of each unfinished game on
+a random empty cell, checks the 10 lines of all games at once and hands a
+random remaining piece over. As all games start from the same position, the
+player to move is the same in every game at every step. It follows the
+policy of the single-game playout, with a threat mask per game computed
+from the lines that hold three pieces.
+"""
+import random
+
+import numpy as np
+
+from .board import LINES, mask_bits
+from .state import NUM_CELLS
+
+DRAW = -1
+_LINE_CELLS = np.array(LINES)  # (10, 4) cell indices
+_EMPTY = 16  # cell value of an empty cell in the batch boards
+
+
+def _completing_table():
+    """Bitmask of the codes completing a line, by the line's 4 cell values.
+
+    Indexed by v0 * 17**3 + v1 * 17**2 + v2 * 17 + v3; nonzero only for lines
+    holding three pieces.
+    """
+    values = np.indices((17,) * 4).reshape(4, -1)
+    occupied = values != _EMPTY
+    line_and = np.bitwise_and.reduce(np.where(occupied, values, 0xF), axis=0)
+    line_or = np.bitwise_or.reduce(np.where(occupied, values, 0), axis=0)
+    codes = np.arange(16)[:, None]
+    completes = ((line_and & codes) != 0) | ((line_or | codes) != 0xF)
+    masks = (completes.astype(np.int32) << codes).sum(axis=0, dtype=np.int32)
+    return np.where(occupied.sum(axis=0) == 3, masks, 0).astype(np.int32)
+
+
+_COMPLETING = _completing_table()
+_LINE_WEIGHTS = 17 ** np.arange(3, -1, -1)
+
+
+def random_playout(state, rng=random):
+    """Play random moves on `state` until the game is over.
+
+    The policy takes an immediate win when there is one and gives random
+    pieces that are not poison while there are any, using the threat mask of
+    the state.
+
+    Returns the winning player, or None for a draw.
+    """
+    if state.won:
+        # The winner placed last, and placing passes the turn
+        return 1 - state.current_player
+    while not state.is_full():
+        if state.in_hand is None:
+            # Random piece among those that do not hand over an immediate win
+            safe = state.available & ~state.threats
+            state.give(rng.choice(mask_bits(safe or state.available)))
+        placer = state.current_player
+        cell = state.winning_cell()
+        if cell is None:
+            cell = rng.choice(state.legal_placements())
+        if state.place(cell):
+            return placer
+    return None
+
+
+def _random_index(rng, allowed):
+    """One uniformly random True column per row of the boolean matrix `allowed`"""
+    return (rng.random(allowed.shape) * allowed).argmax(axis=1)
+
+
+def _batch_codes(state, n):
+    """(n, 16): `n` copies of the cell values of `state`, _EMPTY on empty cells"""
+    return np.tile(np.array([(state.cells >> (cell * 4)) & 0xF if state.occupied >> cell & 1
+                             else _EMPTY for cell in range(NUM_CELLS)], dtype=np.int64), (n, 1))
+
+
+def _line_threats(codes):
+    """(n, 10): bitmask of the codes completing each line of each game"""
+    return _COMPLETING[codes[:, _LINE_CELLS] @ _LINE_WEIGHTS]
+
+
+def batch_playouts(state, n, rng=None):
+    """Play `n` random games from `state`; returns an array of winners.
+
+    Each entry is the winning player (0 or 1) or DRAW. Like random_playout,
+    a game takes an immediate win when there is one and gives pieces that
+    are not poison while there are any.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    if state.won:
+        return np.full(n, 1 - state.current_player, dtype=np.int8)
+    rows = np.arange(n)
+    codes = _batch_codes(state, n)
+    empty = codes == _EMPTY
+    available = np.tile(np.array([bool(state.available >> code & 1) for code in range(16)]),
+                        (n, 1))
+    threats = _line_threats(codes)
+    if state.in_hand is None:
+        in_hand = _safe_give(rng, available, threats)
+        available[rows, in_hand] = False
+    else:
+        in_hand = np.full(n, state.in_hand, dtype=np.int64)
+
+    winners = np.full(n, DRAW, dtype=np.int8)
+    active = np.ones(n, dtype=bool)
+    player = state.current_player
+    for remaining in range(int(empty[0].sum()), 0, -1):
+        # Only a piece completing a line of three wins, and the game takes the
+        # empty cell of the first such line if there is one
+        winning = (threats >> in_hand[:, None]) & 1 != 0
+        can_win = winning.any(axis=1)
+        line = winning.argmax(axis=1)
+        winning_cell = _LINE_CELLS[line, empty[:, _LINE_CELLS][rows, line].argmax(axis=1)]
+        cells = np.where(can_win, winning_cell, _random_index(rng, empty))
+        codes[rows, cells] = in_hand
+        empty[rows, cells] = False
+
+        won = active & can_win
+        winners[won] = player
+        active &= ~won
+        if remaining == 1 or not active.any():
+            break
+
+        player = 1 - player
+        threats = _line_threats(codes)
+        in_hand = _safe_give(rng, available, threats)
+        available[rows, in_hand] = False
+    return winners
+
+
+def _safe_give(rng, available, threats):
+    """A random available piece per game, avoiding poison pieces while there are others"""
+    poison = np.bitwise_or.reduce(threats, axis=1)
+    safe = available & ((poison[:, None] >> np.arange(16)) & 1 == 0)
+    return _random_index(rng, np.where(safe.any(axis=1)[:, None], safe, available))
+
+
+def playout_counts(state, n, player, rng=None):
+    """Return (wins, draws, losses) of `player` over `n` random games from `state`"""
+    winners = batch_playouts(state, n, rng)
+    wins = int(np.count_nonzero(winners == player))
+    draws = int(np.count_nonzero(winners == DRAW))
+    return wins, draws, n - wins - draws
\ No newline at end of file
@@ -0,0 +1,246 @@
+from .budget import SearchBudget
+from .transposition import TranspositionTable, EXACT, LOWER, UPPER
+from .symmetry import canonicalize, unique_placements, unique_gives
+
+WIN_SCORE = 1000
+# Scores beyond this are wins or losses at a known distance
+WIN_THRESHOLD = WIN_SCORE - 100
+# Nodes searched at least this deep are cached under their symmetry canonical
+# key, so equivalent positions share one entry; their best move is stored in
+# the canonical orientation
+CANONICAL_TT_DEPTH = 3
+# Tags canonical keys so they never match a Zobrist key
+_CANONICAL_TAG = 1 << 96
+_TIME_CHECK_INTERVAL = 512
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the budget is exhausted"""
+
+
+def _to_table(score, ply):
+    """Store win/loss scores relative to the node rather than the root"""
+    if score > WIN_THRESHOLD:
+        return score + ply
+    if score < -WIN_THRESHOLD:
+        return score - ply
+    return score
+
+
+def _from_table(score, ply):
+    if score > WIN_THRESHOLD:
+        return score - ply
+    if score < -WIN_THRESHOLD:
+        return score + ply
+    return score
+
+
+class AlphaBetaSearch:
+    """Iterative-deepening negamax with alpha-beta pruning.
+
+    A move is a placement of the piece in hand followed by the piece given to
+    the opponent, (cell, code); a winning placement or the last placement of
+    the game has code None. In a position without a piece in hand (the start
+    of the game) the moves are gives only, (None, code). Scores are from the
+    point of view of the player to decide: WIN_SCORE minus the number of moves
+    for a win, 0 for a draw or an unresolved position.
+
+    Moves are ordered by the transposition table move (the best move of the
+    previous iteration), killer moves and the history heuristic, and
+    immediate wins are taken before any move is generated. When the budget
+    runs out in the middle of an iteration, a root move that has already
+    beaten the previous best at the new depth is played. The principal
+    variation of the last completed iteration is kept as a tuple of moves;
+    it ends early where the line was cut short by a cached score.
+    """
+
+    def __init__(self, transposition_table=None, max_ply=34):
+        # An empty table is falsy, so test for None
+        self.table = transposition_table if transposition_table is not None else TranspositionTable()
+        self.history = [0] * 256  # indexed by cell * 16 + code
+        self.killers = [[None, None] for _ in range(max_ply)]
+        self.pv = [()] * (max_ply + 1)  # best line found below each ply
+        self.nodes = 0
+        self.budget = None
+        self.completed_depth = 0
+        self._root_best = None  # best (move, score) so far in the current iteration
+
+    def search(self, state, budget, max_depth=None):
+        """Return (move, score) from the deepest iteration the budget allows.
+
+        `budget` is a SearchBudget or a number of seconds.
+        """
+        self.budget = SearchBudget.of(budget)
+        self.nodes = 0
+        self.completed_depth = 0
+        self.principal_variation = ()
+        self.table.new_search()
+        self.history = [h >> 1 for h in self.history]
+        state = state.copy()
+
+        moves = self._root_moves(state)
+        if not moves:
+            return None, 0
+        if len(moves) == 1:
+            # Forced move, including a winning placement
+            self.principal_variation = (moves[0],)
+            return moves[0], self._terminal_score(state, moves[0])
+
+        empty = bin(state.empty_mask).count('1')
+        max_depth = min(max_depth or empty, empty)
+        best_move, best_score = moves[0], 0
+        for depth in range(1, max_depth + 1):
+            self._root_best = None
+            try:
+                move, score = self._search_root(state, moves, depth)
+            except SearchTimeout:
+                if self._root_best is not None and self._root_best[0] != best_move:
+                    # Better than the previous best at the interrupted depth
+                    best_move, best_score = self._root_best
+                break
+            best_move, best_score = move, score
+            self.completed_depth = depth
+            self.principal_variation = self.pv[0]
+            # Previous best first for the next iteration
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(score) > WIN_THRESHOLD:
+                break
+        return best_move, best_score
+
+    def _root_moves(self, state):
+        """Root moves with symmetric duplicates removed; a winning move comes alone"""
+        if state.in_hand is None:
+            return [(None, code) for code in unique_gives(state)]
+        moves = []
+        for cell in unique_placements(state):
+            wins = state.push_place(cell)
+            if wins or state.available == 0:
+                state.pop()
+                if wins:
+                    return [(cell, None)]
+                moves.append((cell, None))
+                continue
+            moves.extend((cell, code) for code in unique_gives(state))
+            state.pop()
+        return moves
+
+    def _terminal_score(self, state, move):
+        if move[1] is not None or state.in_hand is None:
+            return 0
+        state.push_place(move[0])
+        won = state.won
+        state.pop()
+        return WIN_SCORE - 1 if won else 0
+
+    def _search_root(self, state, moves, depth):
+        alpha, beta = -WIN_SCORE - 1, WIN_SCORE + 1
+        best_move = None
+        for move in moves:
+            score = -self._child(state, move, depth, -beta, -alpha, 0)
+            if best_move is None or score > alpha:
+                alpha = score
+                best_move = move
+                self.pv[0] = (move,) + self.pv[1]
+                self._root_best = (move, score)
+        return best_move, alpha
+
+    def _child(self, state, move, depth, alpha, beta, ply):
+        """Play `move`, search the opponent's reply and undo it"""
+        cell, code = move
+        if cell is not None:
+            state.push_place(cell)
+        if code is None:
+            # Only reached for the last, non-winning placement
+            score = 0
+            self.pv[ply + 1] = ()
+        else:
+            state.push_give(code)
+            child_depth = depth if cell is None else depth - 1
+            score = self._negamax(state, child_depth, alpha, beta, ply + 1)
+            state.pop()
+        if cell is not None:
+            state.pop()
+        return score
+
+    def _negamax(self, state, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes % _TIME_CHECK_INTERVAL == 0 and self.budget.exhausted(
+                self.nodes, self.table.memory()):
+            raise SearchTimeout()
+
+        self.pv[ply] = ()
+        if state.can_win():
+            return WIN_SCORE - ply
+        cells = state.legal_placements()
+        if depth == 0 or len(cells) == 1:
+            # The last placement cannot win here, so it is a draw
+            return 0
+
+        original_alpha = alpha
+        transform = None
+        if depth >= CANONICAL_TT_DEPTH:
+            key, transform = canonicalize(state)
+            key |= _CANONICAL_TAG
+        else:
+            key = state.key
+        entry = self.table.probe(key)
+        table_move = None
+        if entry is not None:
+            table_move = entry[4]
+            if transform is not None and table_move is not None:
+                table_move = (transform.inverse_cell(table_move[0]),
+                              transform.inverse_code(table_move[1]))
+            if entry[1] >= depth:
+                score = _from_table(entry[2], ply)
+                flag = entry[3]
+                if flag == EXACT:
+                    return score
+                if flag == LOWER and score >= beta:
+                    return score
+                if flag == UPPER and score <= alpha:
+                    return score
+
+        best_score = -WIN_SCORE - 1
+        best_move = None
+        for move in self._ordered_moves(state, cells, table_move, ply):
+            score = -self._child(state, move, depth, -beta, -alpha, ply)
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if score > alpha:
+                alpha = score
+                self.pv[ply] = (move,) + self.pv[ply + 1]
+            if alpha >= beta:
+                self._record_cutoff(move, depth, ply)
+                break
+
+        if best_score <= original_alpha:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        if transform is not None:
+            best_move = (transform.cell(best_move[0]), transform.code(best_move[1]))
+        self.table.store(key, depth, _to_table(best_score, ply), flag, best_move)
+        return best_score
+
+    def _ordered_moves(self, state, cells, table_move, ply):
+        codes = state.available_codes()
+        history = self.history
+        moves = sorted(((cell, code) for cell in cells for code in codes),
+                       key=lambda move: -history[move[0] * 16 + move[1]])
+        first = [move for move in (table_move, *self.killers[ply])
+                 if move is not None and move[0] in cells and move[1] in codes]
+        if first:
+            seen = set(first)
+            moves = list(dict.fromkeys(first)) + [move for move in moves if move not in seen]
+        return moves
+
+    def _record_cutoff(self, move, depth, ply):
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        self.history[move[0] * 16 + move[1]] += depth * depth
\ No newline at end of file
@@ -0,0 +1,270 @@
+import random
+
+from .board import LINES, LINE_MASKS, CELL_LINES, line_wins, mask_bits
+from .piece import Piece
+
+BOARD_SIZE = 4
+NUM_CELLS = 16
+ALL_PIECES = 0xFFFF  # one bit per piece code
+FULL_BOARD = 0xFFFF  # one bit per cell
+
+# Packed per-line accumulators hold one nibble per line
+_LINE_AND_INIT = (1 << (4 * len(LINES))) - 1
+# For each cell: (shift of its lines' nibbles, mask of the line's cells,
+# occupancies of the line with exactly three pieces)
+_LINE_THREES = tuple(frozenset(mask & ~(1 << cell) for cell in line)
+                     for line, mask in zip(LINES, LINE_MASKS))
+_CELL_LINE_SLOTS = tuple(tuple((line * 4, LINE_MASKS[line], _LINE_THREES[line]) for line in lines)
+                         for lines in CELL_LINES)
+# Codes completing a winning line, indexed by the AND and OR of its other three codes
+_COMPLETING = tuple(tuple(sum(1 << code for code in range(16)
+                              if line_wins(common_set & code, any_set | code))
+                          for any_set in range(16))
+                    for common_set in range(16))
+
+# Zobrist keys, from a fixed seed so keys are stable across processes and runs
+_zobrist_rng = random.Random(0x5155_4152)
+ZOBRIST_CELL = tuple(tuple(_zobrist_rng.getrandbits(64) for _ in range(16))
+                     for _ in range(NUM_CELLS))
+ZOBRIST_AVAILABLE = tuple(_zobrist_rng.getrandbits(64) for _ in range(16))
+ZOBRIST_IN_HAND = tuple(_zobrist_rng.getrandbits(64) for _ in range(16))
+ZOBRIST_SIDE = _zobrist_rng.getrandbits(64)
+del _zobrist_rng
+
+
+class GameState:
+    """Compact bitboard representation of a Quarto position.
+
+    Pieces are 4-bit attribute codes (see Piece.code). The board is an
+    occupancy mask plus a 64-bit integer holding one nibble per cell, and the
+    remaining pieces are a 16-bit mask indexed by code, so copying a position
+    only copies a handful of integers. Like Board, it keeps the AND and OR of
+    the codes on every line so a placement only inspects its own lines.
+
+    `key` is a Zobrist hash of the board, the available pieces, the piece in
+    hand and the side to move, updated incrementally by give() and place().
+
+    `threats` is the mask of piece codes that would complete a winning line
+    if placed now, kept up to date by every placement from the lines holding
+    three pieces. Together with the available pieces it answers "does this
+    piece win?" and "which pieces must not be given?" in constant time.
+    """
+    __slots__ = ('occupied', 'cells', 'available', 'in_hand', 'current_player',
+                 'line_and', 'line_or', 'won', 'key', 'threats', '_undo_stack')
+
+    def __init__(self, occupied=0, cells=0, available=ALL_PIECES, in_hand=None,
+                 current_player=0, line_and=_LINE_AND_INIT, line_or=0, won=False,
+                 key=None, threats=None):
+        self.occupied = occupied
+        self.cells = cells
+        self.available = available
+        self.in_hand = in_hand  # code of the piece to be placed, or None
+        self.current_player = current_player
+        self.line_and = line_and
+        self.line_or = line_or
+        self.won = won
+        self.key = self.compute_key() if key is None else key
+        self.threats = self.compute_threats() if threats is None else threats
+        self._undo_stack = None  # created on the first push
+
+    @classmethod
+    def from_game(cls, game):
+        """Encode a quarto.game.Game"""
+        state = cls(available=0, current_player=game.current_player)
+        for row in range(BOARD_SIZE):
+            for col in range(BOARD_SIZE):
+                piece = game.board.get_piece(row, col)
+                if piece is not None:
+                    state._put(row * BOARD_SIZE + col, piece.code)
+        for piece in game.available_pieces:
+            state.available |= 1 << piece.code
+        if game.selected_piece is not None:
+            state.in_hand = game.selected_piece.code
+        state.key = state.compute_key()
+        return state
+
+    def to_game(self):
+        """Decode into a new quarto.game.Game"""
+        from .game import Game
+        game = Game()
+        for cell in range(NUM_CELLS):
+            if self.occupied >> cell & 1:
+                row, col = divmod(cell, BOARD_SIZE)
+                game.board.place_piece(Piece.from_code(self.piece_at(cell)), row, col)
+        game.available_pieces = [p for p in game.available_pieces
+                                 if self.available >> p.code & 1]
+        if self.in_hand is not None:
+            game.selected_piece = Piece.from_code(self.in_hand)
+        game.current_player = self.current_player
+        return game
+
+    def copy(self):
+        return GameState(self.occupied, self.cells, self.available,
+                         self.in_hand, self.current_player,
+                         self.line_and, self.line_or, self.won, self.key, self.threats)
+
+    def __eq__(self, other):
+        if not isinstance(other, GameState):
+            return NotImplemented
+        return (self.occupied == other.occupied and self.cells == other.cells and
+                self.available == other.available and self.in_hand == other.in_hand and
+                self.current_player == other.current_player)
+
+    def __hash__(self):
+        return self.key
+
+    def compute_key(self):
+        """Zobrist hash of the position computed from scratch"""
+        key = ZOBRIST_SIDE if self.current_player else 0
+        for cell in mask_bits(self.occupied):
+            key ^= ZOBRIST_CELL[cell][(self.cells >> (cell * 4)) & 0xF]
+        for code in mask_bits(self.available):
+            key ^= ZOBRIST_AVAILABLE[code]
+        if self.in_hand is not None:
+            key ^= ZOBRIST_IN_HAND[self.in_hand]
+        return key
+
+    def compute_threats(self):
+        """The threats mask computed from scratch"""
+        threats = 0
+        occupied = self.occupied
+        for line, mask in enumerate(LINE_MASKS):
+            if occupied & mask in _LINE_THREES[line]:
+                shift = line * 4
+                threats |= _COMPLETING[(self.line_and >> shift) & 0xF][(self.line_or >> shift) & 0xF]
+        return threats
+
+    @property
+    def poison(self):
+        """Mask of the available pieces that would let the receiver win at once"""
+        return self.threats & self.available
+
+    def can_win(self):
+        """True if the piece in hand wins on some empty cell"""
+        return self.in_hand is not None and bool(self.threats >> self.in_hand & 1)
+
+    def winning_cell(self, code=None):
+        """An empty cell where `code` (default: the piece in hand) wins, or None"""
+        code = self.in_hand if code is None else code
+        if code is None or not self.threats >> code & 1:
+            return None
+        occupied = self.occupied
+        for line, mask in enumerate(LINE_MASKS):
+            if occupied & mask in _LINE_THREES[line]:
+                shift = line * 4
+                if _COMPLETING[(self.line_and >> shift) & 0xF][(self.line_or >> shift) & 0xF] >> code & 1:
+                    return (mask & ~occupied).bit_length() - 1
+        return None
+
+    def piece_at(self, cell):
+        if not self.occupied >> cell & 1:
+            return None
+        return (self.cells >> (cell * 4)) & 0xF
+
+    @property
+    def empty_mask(self):
+        return ~self.occupied & FULL_BOARD
+
+    def available_codes(self):
+        return mask_bits(self.available)
+
+    def empty_cells(self):
+        return mask_bits(~self.occupied & FULL_BOARD)
+
+    def legal_placements(self):
+        """Cells for the piece in hand; empty when no piece is in hand"""
+        if self.in_hand is None:
+            return ()
+        return mask_bits(~self.occupied & FULL_BOARD)
+
+    def legal_gives(self):
+        """Codes of the pieces that can be handed over; empty while one is in hand"""
+        if self.in_hand is not None:
+            return ()
+        return mask_bits(self.available)
+
+    def give(self, code):
+        """Hand the available piece `code` to the player about to place"""
+        if self.in_hand is not None:
+            raise ValueError("A piece is already selected")
+        if not self.available >> code & 1:
+            raise ValueError("Piece not available")
+        self.available &= ~(1 << code)
+        self.in_hand = code
+        self.key ^= ZOBRIST_AVAILABLE[code] ^ ZOBRIST_IN_HAND[code]
+
+    def place(self, cell):
+        """Place the piece in hand on `cell`, pass the turn and return True on a win"""
+        if self.in_hand is None:
+            raise ValueError("No piece selected")
+        if self.occupied >> cell & 1:
+            raise ValueError("Position already occupied")
+        code = self.in_hand
+        won = self._put(cell, code)
+        self.key ^= ZOBRIST_IN_HAND[code] ^ ZOBRIST_CELL[cell][code] ^ ZOBRIST_SIDE
+        self.in_hand = None
+        self.current_player = 1 - self.current_player
+        return won
+
+    def _put(self, cell, code):
+        """Store `code` on `cell` and update the accumulators of its lines"""
+        occupied = self.occupied | (1 << cell)
+        self.occupied = occupied
+        self.cells |= code << (cell * 4)
+        cleared = code ^ 0xF
+        won = False
+        filled = False
+        for shift, mask, threes in _CELL_LINE_SLOTS[cell]:
+            self.line_and &= ~(cleared << shift)
+            self.line_or |= code << shift
+            line = occupied & mask
+            if line == mask:
+                filled = True
+                if line_wins((self.line_and >> shift) & 0xF, (self.line_or >> shift) & 0xF):
+                    won = True
+            elif line in threes:
+                self.threats |= _COMPLETING[(self.line_and >> shift) & 0xF][(self.line_or >> shift) & 0xF]
+        if filled:
+            # A line left the three-piece set; its codes may no longer be threats
+            self.threats = self.compute_threats()
+        if won:
+            self.won = True
+        return won
+
+    def push_give(self, code):
+        """give() that can be reverted with pop()"""
+        snapshot = self._snapshot()
+        self.give(code)
+        self._push(snapshot)
+
+    def push_place(self, cell):
+        """place() that can be reverted with pop()"""
+        snapshot = self._snapshot()
+        won = self.place(cell)
+        self._push(snapshot)
+        return won
+
+    def pop(self):
+        """Restore the position as it was before the latest push_give/push_place"""
+        if not self._undo_stack:
+            raise ValueError("No move to undo")
+        (self.occupied, self.cells, self.available, self.in_hand, self.current_player,
+         self.line_and, self.line_or, self.won, self.key, self.threats) = self._undo_stack.pop()
+
+    def _snapshot(self):
+        return (self.occupied, self.cells, self.available, self.in_hand, self.current_player,
+                self.line_and, self.line_or, self.won, self.key, self.threats)
+
+    def _push(self, snapshot):
+        if self._undo_stack is None:
+            self._undo_stack = []
+        self._undo_stack.append(snapshot)
+
+    def check_win(self):
+        return self.won
+
+    def is_full(self):
+        return self.occupied == FULL_BOARD
+
+    def is_game_over(self):
+        return self.check_win() or self.is_full()
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""Structured statistics of the AI decisions."""
+
+
+class SearchStats:
+    """What one AIPlayer.make_move or select_piece call did.
+
+    `kind` is 'move' or 'piece' and `source` tells where the decision came
+    from: 'book', 'tablebase' (the file), 'solver' (an MCTS endgame searched
+    to the end by alpha-beta), 'planned' (decided together with the previous
+    move) or 'search' (the strategy itself). Counters that do not apply to a strategy stay 0. The
+    principal variation is the expected line of play from the position as
+    alternating placements (cells) and gives (piece codes), starting with
+    the decision itself.
+    """
+
+    def __init__(self, kind, strategy, source='search'):
+        self.kind = kind
+        self.strategy = strategy
+        self.source = source
+        self.choice = None  # cell or piece code
+        # Minimax score, or the MCTS mean result of the choice:
+        # (wins - losses) / visits, in [-1, 1]
+        self.score = None
+        self.nodes = 0  # minimax nodes searched, or MCTS nodes added
+        self.playouts = 0
+        self.max_depth = 0
+        self.cache_hits = 0  # transposition table hits, or MCTS visits reused from earlier searches
+        self.elapsed = 0.0
+        self.pondered = 0.0  # seconds searched in the opponent's time before this decision
+        self.principal_variation = ()
+
+    @property
+    def nodes_per_second(self):
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self):
+        return {'kind': self.kind, 'strategy': self.strategy, 'source': self.source,
+                'choice': self.choice, 'score': self.score, 'nodes': self.nodes,
+                'playouts': self.playouts, 'max_depth': self.max_depth,
+                'cache_hits': self.cache_hits, 'elapsed': self.elapsed, 'pondered': self.pondered,
+                'nodes_per_second': self.nodes_per_second,
+                'principal_variation': list(self.principal_variation)}
+
+    def __str__(self):
+        text = f"{self.strategy} {self.kind} {self.choice} from {self.source} in {self.elapsed:.3f}s"
+        if self.pondered:
+            text += f" after pondering {self.pondered:.1f}s"
+        if self.source != 'search':
+            return text
+        return (f"{text}: score {self.score}, {self.nodes} nodes ({self.nodes_per_second:.0f}/s), "
+                f"{self.playouts} playouts, depth {self.max_depth}, {self.cache_hits} cache hits, "
+                f"line {list(self.principal_variation)}")
+
+
+def flatten_moves(moves):
+    """Minimax (cell, code) moves as one line of alternating cells and codes"""
+    return tuple(action for move in moves for action in move if action is not None)
\ No newline at end of file
@@ -0,0 +1,177 @@
+from itertools import permutations
+
+from .board import LINES, mask_bits
+from .state import GameState, NUM_CELLS
+
+
+def _cell_map(func):
+    """Cell permutation from a function mapping (row, col) to (row, col)"""
+    return tuple(r * 4 + c for r, c in (func(*divmod(cell, 4)) for cell in range(NUM_CELLS)))
+
+
+def _generate_group(generators):
+    identity = tuple(range(NUM_CELLS))
+    group = {identity}
+    frontier = [identity]
+    while frontier:
+        g = frontier.pop()
+        for h in generators:
+            composed = tuple(h[g[cell]] for cell in range(NUM_CELLS))
+            if composed not in group:
+                group.add(composed)
+                frontier.append(composed)
+    return sorted(group)
+
+
+_SWAP_OUTER = (1, 0, 3, 2)
+_SWAP_INNER = (0, 2, 1, 3)
+
+# The 32 cell permutations that map lines onto lines: the 8 rotations and
+# reflections of the square combined with the "inside-out" and "swap middle
+# rows and columns" transformations of the Quarto board.
+GEOMETRIC = tuple(_generate_group([
+    _cell_map(lambda r, c: (c, 3 - r)),
+    _cell_map(lambda r, c: (r, 3 - c)),
+    _cell_map(lambda r, c: (_SWAP_OUTER[r], _SWAP_OUTER[c])),
+    _cell_map(lambda r, c: (_SWAP_INNER[r], _SWAP_INNER[c])),
+]))
+GEOMETRIC_INVERSE = tuple(tuple(g.index(cell) for cell in range(NUM_CELLS)) for g in GEOMETRIC)
+
+assert len(GEOMETRIC) == 32
+assert all({frozenset(g[cell] for cell in line) for line in LINES} ==
+           {frozenset(line) for line in LINES} for g in GEOMETRIC)
+
+
+def _permute_bits(code, perm):
+    return sum(1 << perm[bit] for bit in range(4) if code >> bit & 1)
+
+
+# Attribute symmetries: a code x maps to PERMUTATIONS[p][x ^ mask], i.e. some
+# attributes are complemented and then the four attributes are reordered.
+PERMUTATIONS = tuple(tuple(_permute_bits(code, perm) for code in range(16))
+                     for perm in permutations(range(4)))
+PERMUTATIONS_INVERSE = tuple(tuple(table.index(code) for code in range(16))
+                             for table in PERMUTATIONS)
+
+
+class Transform:
+    """A board symmetry combined with an attribute symmetry"""
+    __slots__ = ('geometric', 'mask', 'permutation')
+
+    def __init__(self, geometric, mask, permutation):
+        self.geometric = geometric  # index into GEOMETRIC
+        self.mask = mask  # attributes complemented before permuting
+        self.permutation = permutation  # index into PERMUTATIONS
+
+    def cell(self, cell):
+        return GEOMETRIC[self.geometric][cell]
+
+    def code(self, code):
+        return PERMUTATIONS[self.permutation][code ^ self.mask]
+
+    def inverse_cell(self, cell):
+        return GEOMETRIC_INVERSE[self.geometric][cell]
+
+    def inverse_code(self, code):
+        return PERMUTATIONS_INVERSE[self.permutation][code] ^ self.mask
+
+    def apply(self, state):
+        """Return the transformed copy of `state`"""
+        result = GameState(available=0, current_player=state.current_player)
+        for cell in mask_bits(state.occupied):
+            result._put(self.cell(cell), self.code(state.piece_at(cell)))
+        for code in mask_bits(state.available):
+            result.available |= 1 << self.code(code)
+        if state.in_hand is not None:
+            result.in_hand = self.code(state.in_hand)
+        result.key = result.compute_key()
+        return result
+
+
+def canonicalize(state):
+    """Return (key, transform) for the canonical form of `state`.
+
+    Two positions get the same key exactly when some Transform maps one onto
+    the other, and transform maps `state` onto the canonical form. The key
+    describes the board and the piece in hand; the available pieces are the
+    ones not on either, as in any position reached by play.
+
+    The canonical form is the smallest (occupancy, codes in cell order, piece
+    in hand) over all transforms. For a given board symmetry the smallest
+    sequence must start with code 0, which fixes the complement mask, so only
+    the 24 attribute orders are left to try.
+    """
+    occupied = state.occupied
+    best = None
+    candidates = []
+    for index, g in enumerate(GEOMETRIC):
+        mapped = 0
+        for cell in mask_bits(occupied):
+            mapped |= 1 << g[cell]
+        if best is None or mapped < best:
+            best = mapped
+            candidates = [index]
+        elif mapped == best:
+            candidates.append(index)
+
+    cells = state.cells
+    best_sequence = None
+    best_transform = None
+    for index in candidates:
+        inverse = GEOMETRIC_INVERSE[index]
+        sequence = [(cells >> (inverse[cell] * 4)) & 0xF for cell in mask_bits(best)]
+        if state.in_hand is not None:
+            sequence.append(state.in_hand)
+        if not sequence:
+            best_sequence, best_transform = (), Transform(index, 0, 0)
+            break
+        mask = sequence[0]
+        flipped = [code ^ mask for code in sequence]
+        for perm, table in enumerate(PERMUTATIONS):
+            mapped = tuple(table[code] for code in flipped)
+            if best_sequence is None or mapped < best_sequence:
+                best_sequence = mapped
+                best_transform = Transform(index, mask, perm)
+
+    key = best
+    placed = len(best_sequence) - (state.in_hand is not None)
+    for code in best_sequence[:placed]:
+        key = (key << 4) | code
+    key <<= 5
+    if state.in_hand is not None:
+        key |= best_sequence[-1] + 1
+    return key, best_transform
+
+
+def canonical_key(state):
+    return canonicalize(state)[0]
+
+
+def unique_placements(state):
+    """One placement cell per class of symmetric results, in cell order"""
+    seen = set()
+    cells = []
+    state = state.copy()
+    for cell in state.legal_placements():
+        state.push_place(cell)
+        key = canonical_key(state)
+        state.pop()
+        if key not in seen:
+            seen.add(key)
+            cells.append(cell)
+    return cells
+
+
+def unique_gives(state):
+    """One piece code per class of symmetric gives, in code order"""
+    seen = set()
+    codes = []
+    state = state.copy()
+    for code in state.legal_gives():
+        state.push_give(code)
+        key = canonical_key(state)
+        state.pop()
+        if key not in seen:
+            seen.add(key)
+            codes.append(code)
+    return codes
\ No newline at end of file
@@ -0,0 +1,201 @@
+"""Endgame tablebase: exact results for positions with few empty cells.
+
+The file maps the canonical key of a position with a piece in hand (see
+quarto.symmetry) to its game-theoretic value for the player about to place
+and a best move, stored in the canonical orientation. It is an open
+addressing hash table that the loader memory-maps, so a lookup reads a single
+slot (rarely a few neighbours) without loading the file.
+
+A file is a cache for debugging and analysis rather than a playing aid: it
+only holds the endgame subtrees of the random games it was generated from,
+so the positions of a real game almost never hit it. AIPlayer only probes a
+file it is given explicitly.
+
+Generate one with:
+
+    python -m quarto.tablebase endgame.qtb --max-empty 6 --positions 500
+"""
+import argparse
+import mmap
+import os
+import random
+import struct
+
+from .state import GameState
+from .symmetry import canonicalize
+
+MAGIC = b'QTB1'
+# magic, format version, max empty cells covered, slot count, entry count
+_HEADER = struct.Struct('<4sHHQQ')
+_KEY_BYTES = 11  # canonical keys fit in 85 bits
+_SLOT_SIZE = _KEY_BYTES + 2
+_NO_PIECE = 16
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), 'data', 'endgame.qtb')
+
+
+def _slot_index(key, slots):
+    # Canonical keys are highly structured, so mix them before reducing
+    return ((key * 0x9E3779B97F4A7C15) >> 32) % slots
+
+
+def _pack_result(value, cell, code):
+    return (value + 1) | cell << 2 | (_NO_PIECE if code is None else code) << 6
+
+
+def _unpack_result(packed):
+    code = packed >> 6
+    return (packed & 3) - 1, (packed >> 2) & 0xF, None if code == _NO_PIECE else code
+
+
+class EndgameSolver:
+    """Exact solver for positions with a piece in hand, memoised by canonical key"""
+
+    def __init__(self):
+        self.results = {}  # canonical key -> (value, cell, code) in canonical orientation
+
+    def solve(self, state):
+        """Return (value, cell, code) for the player about to place"""
+        key, transform = canonicalize(state)
+        result = self.results.get(key)
+        if result is not None:
+            value, cell, code = result
+            return (value, transform.inverse_cell(cell),
+                    None if code is None else transform.inverse_code(code))
+
+        best = None
+        state = state.copy()
+        for cell in state.legal_placements():
+            if state.push_place(cell):
+                state.pop()
+                best = (1, cell, None)
+                break
+            if state.available == 0:
+                state.pop()
+                candidate = (0, cell, None)
+            else:
+                candidate = None
+                for code in state.legal_gives():
+                    state.push_give(code)
+                    value = -self.solve(state)[0]
+                    state.pop()
+                    if candidate is None or value > candidate[0]:
+                        candidate = (value, cell, code)
+                    if value == 1:
+                        break
+                state.pop()
+            if best is None or candidate[0] > best[0]:
+                best = candidate
+            if best[0] == 1:
+                break
+
+        value, cell, code = best
+        self.results[key] = (value, transform.cell(cell),
+                             None if code is None else transform.code(code))
+        return best
+
+
+def generate_tablebase(path, max_empty=6, positions=500, seed=0):
+    """Solve the endgames of `positions` random games and write them to `path`.
+
+    Every position reached while solving, down to the end of the game, is
+    written, so the table covers whole endgame subtrees rather than isolated
+    positions. Returns the number of entries written.
+    """
+    rng = random.Random(seed)
+    solver = EndgameSolver()
+    for _ in range(positions):
+        state = _random_endgame(rng, max_empty)
+        if state is not None:
+            solver.solve(state)
+    write_tablebase(path, solver.results, max_empty)
+    return len(solver.results)
+
+
+def _random_endgame(rng, max_empty):
+    state = GameState()
+    while True:
+        state.give(rng.choice(state.legal_gives()))
+        if 16 - bin(state.occupied).count('1') <= max_empty:
+            return state
+        if state.place(rng.choice(state.legal_placements())):
+            return None
+
+
+def write_tablebase(path, results, max_empty):
+    slots = max(1, len(results) * 2)  # at most half full keeps probes short
+    table = bytearray(slots * _SLOT_SIZE)
+    for key, (value, cell, code) in results.items():
+        index = _slot_index(key, slots)
+        while table[index * _SLOT_SIZE:(index + 1) * _SLOT_SIZE].strip(b'\0'):
+            index = (index + 1) % slots
+        offset = index * _SLOT_SIZE
+        # Store key + 1 so an all-zero slot always means empty
+        table[offset:offset + _KEY_BYTES] = (key + 1).to_bytes(_KEY_BYTES, 'little')
+        struct.pack_into('<H', table, offset + _KEY_BYTES, _pack_result(value, cell, code))
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, 1, max_empty, slots, len(results)))
+        f.write(table)
+
+
+class Tablebase:
+    """Read-only, memory-mapped view of a tablebase file"""
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.max_empty, self.slots, self.entries = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != 1:
+            self.close()
+            raise ValueError(f"{path} is not a tablebase file")
+
+    def covers(self, state):
+        """Whether the file holds the result of `state`"""
+        return self.probe(state) is not None
+
+    def probe(self, state):
+        """Return (value, cell, code) for the player about to place, or None.
+
+        value is 1, 0 or -1 for a win, draw or loss with best play, and code is
+        the piece to give after placing on cell (None when the game ends).
+        """
+        if state.in_hand is None or 16 - bin(state.occupied).count('1') > self.max_empty:
+            return None
+        key, transform = canonicalize(state)
+        stored = (key + 1).to_bytes(_KEY_BYTES, 'little')
+        index = _slot_index(key, self.slots)
+        for _ in range(self.slots):
+            offset = _HEADER.size + index * _SLOT_SIZE
+            slot_key = self._map[offset:offset + _KEY_BYTES]
+            if slot_key == stored:
+                value, cell, code = _unpack_result(
+                    struct.unpack_from('<H', self._map, offset + _KEY_BYTES)[0])
+                return (value, transform.inverse_cell(cell),
+                        None if code is None else transform.inverse_code(code))
+            if not slot_key.strip(b'\0'):
+                return None
+            index = (index + 1) % self.slots
+        return None
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a Quarto endgame tablebase")
+    parser.add_argument('output', nargs='?', default=DEFAULT_PATH)
+    parser.add_argument('--max-empty', type=int, default=6,
+                        help="largest number of empty cells covered")
+    parser.add_argument('--positions', type=int, default=500,
+                        help="random endgame positions to solve")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    entries = generate_tablebase(args.output, args.max_empty, args.positions, args.seed)
+    print(f"Wrote {entries} positions to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
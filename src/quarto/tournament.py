@@ -0,0 +1,213 @@
+"""Headless self-play tournaments between two AIPlayer configurations.
+
+A player is given as a strategy name with optional settings, for example
+``mcts:time=0.5,threads=2`` or ``minimax:time=1``. Games are played in
+parallel worker processes and the two players alternate giving the first
+piece. Run with:
+
+    python -m quarto.tournament mcts minimax:time=0.5 --games 100 --workers 4
+"""
+import argparse
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+import numpy as np
+
+from .game import Game
+from .ai_player import AIPlayer
+
+STRATEGIES = ('simple', 'minimax', 'mcts', 'evolutionary')
+# Player settings accepted in a specification, and their value types
+SETTINGS = {
+    'time': float,  # seconds per decision for minimax and MCTS
+    'workers': int,  # MCTS root-parallel processes
+    'threads': int,  # MCTS tree-parallel threads
+    'batch': int,  # MCTS playouts per leaf
+}
+Z_95 = 1.959964
+
+
+def parse_player(spec):
+    """Split 'strategy:key=value,...' into (strategy, settings)"""
+    strategy, _, options = spec.partition(':')
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}' in '{spec}'")
+    settings = {}
+    for option in filter(None, options.split(',')):
+        key, separator, value = option.partition('=')
+        if not separator or key not in SETTINGS:
+            raise ValueError(f"Invalid player setting '{option}' in '{spec}'")
+        settings[key] = SETTINGS[key](value)
+    return strategy, settings
+
+
+def make_player(spec):
+    strategy, settings = parse_player(spec)
+    # Tournament games already run in parallel, so searches use one process
+    player = AIPlayer(strategy, mcts_workers=settings.get('workers', 1),
+                      mcts_threads=settings.get('threads', 1),
+                      mcts_batch=settings.get('batch', 1))
+    if 'time' in settings:
+        player.simulation_time = player.search_time = settings['time']
+    return player
+
+
+def play_game(specs, first, seed):
+    """Play one game between the players `specs` where specs[first] gives the first piece.
+
+    Returns (winner index into specs or None for a draw, total decision
+    seconds per player, decisions per player).
+    """
+    random.seed(seed)
+    np.random.seed(seed % (1 << 32))
+    players = [make_player(spec) for spec in specs]
+    seconds = [0.0, 0.0]
+    decisions = [0, 0]
+    # Game seat 1 gives the first piece; seats[s] is the player sitting there
+    seats = (1 - first, first)
+    game = Game()
+    try:
+        while True:
+            giver = seats[1 - game.current_player]
+            start = perf_counter()
+            piece = players[giver].select_piece(game)
+            seconds[giver] += perf_counter() - start
+            decisions[giver] += 1
+            game.select_piece(piece)
+
+            placer = seats[game.current_player]
+            start = perf_counter()
+            row, col = players[placer].make_move(game)
+            seconds[placer] += perf_counter() - start
+            decisions[placer] += 1
+            if game.place_selected_piece(row, col):
+                return placer, seconds, decisions
+            if game.board.is_full():
+                return None, seconds, decisions
+    finally:
+        for player in players:
+            player.close()
+
+
+def _play_game_worker(args):
+    """Process pool entry point"""
+    return play_game(*args)
+
+
+def elo_difference(score):
+    """Elo difference implied by an expected score in [0, 1], infinite at 0 and 1"""
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+    return 400 * math.log10(score / (1 - score))
+
+
+def elo_estimate(wins, draws, losses):
+    """(Elo difference, lower, upper) with a 95% confidence interval.
+
+    The interval is the Wilson score interval of the score, counting a draw
+    as half a win. Unlike the normal approximation it does not collapse
+    when one side won every game: the difference and one bound are then
+    infinite, and the other bound is finite.
+    """
+    games = wins + draws + losses
+    if games < 1:
+        raise ValueError("An Elo estimate needs at least one game")
+    score = (wins + draws / 2) / games
+    z2 = Z_95 ** 2
+    center = (score + z2 / (2 * games)) / (1 + z2 / games)
+    margin = Z_95 * math.sqrt(score * (1 - score) / games + z2 / (4 * games ** 2)) / (1 + z2 / games)
+    # The bounds reach 0 and 1 exactly, which rounding could miss
+    low = 0.0 if score == 0 else center - margin
+    high = 1.0 if score == 1 else center + margin
+    return elo_difference(score), elo_difference(low), elo_difference(high)
+
+
+def run_tournament(spec_a, spec_b, games, workers=None, seed=0, progress=None):
+    """Play `games` games between two player specifications.
+
+    Returns a dict with the wins, draws and losses of player A, its Elo
+    difference to B with a 95% confidence interval, the mean decision
+    latency of both players and the games per second. `progress`, if given,
+    is called with (games done, games) as games finish.
+    """
+    if games < 1:
+        raise ValueError("A tournament needs at least one game")
+    specs = (spec_a, spec_b)
+    for spec in specs:
+        parse_player(spec)  # fail before starting the pool
+    rng = random.Random(seed)
+    jobs = [(specs, game % 2, rng.getrandbits(63)) for game in range(games)]
+    wins = draws = losses = 0
+    seconds = [0.0, 0.0]
+    decisions = [0, 0]
+    start = perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for done, (winner, game_seconds, game_decisions) in enumerate(
+                executor.map(_play_game_worker, jobs), 1):
+            if winner is None:
+                draws += 1
+            elif winner == 0:
+                wins += 1
+            else:
+                losses += 1
+            for player in range(2):
+                seconds[player] += game_seconds[player]
+                decisions[player] += game_decisions[player]
+            if progress:
+                progress(done, games)
+    elapsed = perf_counter() - start
+    elo, elo_low, elo_high = elo_estimate(wins, draws, losses)
+    return {
+        'players': list(specs), 'games': games,
+        'wins': wins, 'draws': draws, 'losses': losses,
+        'elo': elo, 'elo_low': elo_low, 'elo_high': elo_high,
+        'latency': [seconds[player] / max(decisions[player], 1) for player in range(2)],
+        'games_per_second': games / elapsed, 'seconds': elapsed,
+    }
+
+
+def format_elo(elo, low, high):
+    """The Elo difference and its interval, as a bound when one side won every game"""
+    if math.isinf(high):
+        return f">= {low:+.0f} (95% confidence)"
+    if math.isinf(low):
+        return f"<= {high:+.0f} (95% confidence)"
+    return f"{elo:+.0f} (95% CI {low:+.0f} to {high:+.0f})"
+
+
+def format_report(result):
+    spec_a, spec_b = result['players']
+    latency_a, latency_b = result['latency']
+    return "\n".join([
+        f"{spec_a} vs {spec_b}: {result['games']} games",
+        f"  W/D/L for {spec_a}: {result['wins']}/{result['draws']}/{result['losses']}",
+        f"  Elo difference: {format_elo(result['elo'], result['elo_low'], result['elo_high'])}",
+        f"  Mean decision latency: {spec_a} {latency_a * 1000:.1f} ms, "
+        f"{spec_b} {latency_b * 1000:.1f} ms",
+        f"  {result['games_per_second']:.2f} games/s ({result['seconds']:.1f}s)",
+    ])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play a self-play tournament between two AI players")
+    parser.add_argument('player_a', help="strategy[:time=..,workers=..,threads=..,batch=..]")
+    parser.add_argument('player_b')
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None,
+                        help="game processes (default: one per CPU)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    try:
+        result = run_tournament(args.player_a, args.player_b, args.games, args.workers,
+                                args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+    print(format_report(result))
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
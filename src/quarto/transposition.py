@@ -0,0 +1,78 @@
+EXACT = 0
+LOWER = 1  # score is a lower bound (search failed high)
+UPPER = 2  # score is an upper bound (search failed low)
+# Approximate bytes held by one stored entry: the tuple, its key and its move
+ENTRY_BYTES = 200
+
+
+def _slot_index(key, slots):
+    # Symmetry canonical keys keep the piece in hand and the last codes in
+    # their low bits, so mix them before reducing
+    return ((key * 0x9E3779B97F4A7C15) >> 32) % slots
+
+
+class TranspositionTable:
+    """Fixed-size cache of search results keyed by GameState.key or a canonical key.
+
+    Each slot holds one entry (key, depth, score, flag, best_move, generation).
+    When two positions map to the same slot the deeper search is kept, unless
+    the stored entry comes from an older search (see new_search), so the table
+    can be kept for a whole game without filling up with stale results.
+    """
+
+    def __init__(self, max_entries=1 << 18):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self._slots = [None] * max_entries
+        self._generation = 0
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def new_search(self):
+        """Mark existing entries as older than the ones stored from now on"""
+        self._generation += 1
+
+    def probe(self, key):
+        """Return the entry stored for `key`, or None"""
+        entry = self._slots[_slot_index(key, self.max_entries)]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        if entry is not None:
+            self.collisions += 1
+        return None
+
+    def store(self, key, depth, score, flag, best_move=None):
+        index = _slot_index(key, self.max_entries)
+        entry = self._slots[index]
+        if entry is None:
+            self.size += 1
+        elif entry[0] != key and entry[1] > depth and entry[5] == self._generation:
+            # Depth-preferred: keep the deeper result from the current search
+            return
+        self._slots[index] = (key, depth, score, flag, best_move, self._generation)
+
+    def clear(self):
+        self._slots = [None] * self.max_entries
+        self.size = 0
+        self.hits = self.misses = self.collisions = 0
+
+    def memory(self):
+        """Approximate bytes used by the slots and the stored entries"""
+        return 8 * self.max_entries + ENTRY_BYTES * self.size
+
+    def stats(self):
+        return {
+            'entries': self.size,
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'collisions': self.collisions,
+        }
+
+    def __len__(self):
+        return self.size
\ No newline at end of file
@@ -0,0 +1,53 @@
+import random
+
+from quarto.game import Game
+
+
+def snapshot(game):
+    """Everything push/pop must restore, down to the board's line accumulators"""
+    board = game.board
+    return ([piece.code for piece in game.available_pieces],
+            None if game.selected_piece is None else game.selected_piece.code,
+            game.current_player,
+            [[None if piece is None else piece.code for piece in row] for row in board.board],
+            list(board._line_counts), list(board._line_and), list(board._line_or),
+            board._winning_lines, board.empty_mask)
+
+
+def push_random(game, rng):
+    """Push a random select or place; returns a function that pushes it again"""
+    if game.selected_piece is None:
+        index = rng.choice(game.legal_gives())
+        push = lambda: game.push_select(index)
+    else:
+        cell = rng.choice(game.legal_placements())
+        push = lambda: game.push_place(*cell)
+    push()
+    return push
+
+
+def test_pop_restores_every_push():
+    rng = random.Random(1)
+    for _ in range(300):
+        game = Game()
+        while not game.is_game_over():
+            before = snapshot(game)
+            push = push_random(game, rng)
+            after = snapshot(game)
+            game.pop()
+            assert snapshot(game) == before
+            push()
+            assert snapshot(game) == after
+
+
+def test_pop_unwinds_whole_games():
+    rng = random.Random(2)
+    for _ in range(300):
+        game = Game()
+        history = []
+        while not game.is_game_over():
+            history.append(snapshot(game))
+            push_random(game, rng)
+        while history:
+            game.pop()
+            assert snapshot(game) == history.pop()
\ No newline at end of file
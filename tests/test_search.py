@@ -0,0 +1,47 @@
+import random
+
+from quarto.budget import SearchBudget
+from quarto.search import AlphaBetaSearch
+from quarto.state import GameState
+from quarto.tablebase import EndgameSolver
+
+
+def random_endgames(count, empty, seed):
+    """Positions from random games with `empty` empty cells and a piece in hand"""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        state = GameState()
+        while not state.won and bin(state.empty_mask).count('1') > empty:
+            state.give(rng.choice(state.legal_gives()))
+            state.place(rng.choice(state.legal_placements()))
+        if not state.won:
+            state.give(rng.choice(state.legal_gives()))
+            positions.append(state)
+    return positions
+
+
+def move_value(solver, state, move):
+    """Exact value of `move` for the player about to place"""
+    state = state.copy()
+    cell, code = move
+    if state.place(cell):
+        return 1
+    if code is None:
+        return 0
+    state.give(code)
+    return -solver.solve(state)[0]
+
+
+def sign(score):
+    return (score > 0) - (score < 0)
+
+
+def test_alpha_beta_matches_endgame_solver():
+    solver = EndgameSolver()
+    for empty in (3, 4, 5):
+        for state in random_endgames(15, empty, seed=empty):
+            value = solver.solve(state)[0]
+            move, score = AlphaBetaSearch().search(state, SearchBudget())
+            assert sign(score) == value
+            assert move_value(solver, state, move) == value
\ No newline at end of file
@@ -0,0 +1,78 @@
+import random
+
+import numpy as np
+
+from quarto.board import LINES
+from quarto.playout import _batch_codes, _line_threats, batch_playouts
+from quarto.state import GameState
+
+
+def brute_force_threats(state):
+    """Codes that complete a line sharing an attribute on some empty cell"""
+    threats = 0
+    for line in LINES:
+        empty = [cell for cell in line if not state.occupied >> cell & 1]
+        if len(empty) != 1:
+            continue
+        codes = [state.piece_at(cell) for cell in line if cell != empty[0]]
+        for code in range(16):
+            both = 0xF
+            either = 0
+            for other in codes + [code]:
+                both &= other
+                either |= other
+            if both or either != 0xF:
+                threats |= 1 << code
+    return threats
+
+
+def random_positions(games, seed):
+    """Positions with a piece in hand from random games, until each game is won"""
+    rng = random.Random(seed)
+    for _ in range(games):
+        state = GameState()
+        while not state.is_game_over():
+            state.give(rng.choice(state.legal_gives()))
+            yield state
+            if state.place(rng.choice(state.legal_placements())):
+                break
+
+
+def test_threats_match_brute_force():
+    for state in random_positions(300, seed=1):
+        threats = brute_force_threats(state)
+        assert state.threats == threats
+        assert state.compute_threats() == threats
+        assert state.poison == threats & state.available
+        assert state.can_win() == bool(threats >> state.in_hand & 1)
+
+
+def test_winning_cell_wins():
+    for state in random_positions(300, seed=2):
+        cell = state.winning_cell()
+        if state.can_win():
+            assert state.copy().place(cell)
+        else:
+            assert cell is None
+
+
+def test_pop_restores_threats():
+    for state in random_positions(100, seed=3):
+        threats = state.threats
+        for cell in state.legal_placements():
+            state.push_place(cell)
+            state.pop()
+            assert state.threats == threats
+
+
+def test_batch_threats_match_state():
+    for state in random_positions(100, seed=4):
+        threats = np.bitwise_or.reduce(_line_threats(_batch_codes(state, 1)), axis=1)
+        assert int(threats[0]) == state.threats
+
+
+def test_batch_playouts_take_wins():
+    rng = np.random.default_rng(5)
+    for state in random_positions(100, seed=5):
+        if state.can_win():
+            assert (batch_playouts(state, 16, rng) == state.current_player).all()
\ No newline at end of file
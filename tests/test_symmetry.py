@@ -0,0 +1,61 @@
+import random
+
+from quarto.board import mask_bits
+from quarto.state import GameState
+from quarto.symmetry import GEOMETRIC, PERMUTATIONS, Transform, canonicalize
+
+# Every board symmetry with every complement mask and attribute order
+TRANSFORMS = [Transform(geometric, mask, permutation)
+              for geometric in range(len(GEOMETRIC))
+              for mask in range(16)
+              for permutation in range(len(PERMUTATIONS))]
+
+
+def form_key(state):
+    """The key canonicalize() gives `state` when it is its own canonical form"""
+    key = state.occupied
+    for cell in mask_bits(state.occupied):
+        key = key << 4 | state.piece_at(cell)
+    key <<= 5
+    if state.in_hand is not None:
+        key |= state.in_hand + 1
+    return key
+
+
+def random_position(rng, placements, in_hand=True):
+    """A random position with `placements` pieces on the board and no line won"""
+    while True:
+        state = GameState()
+        while True:
+            if bin(state.occupied).count('1') == placements and not in_hand:
+                return state
+            # Pieces that cannot complete a line, so the game goes on
+            safe = [code for code in state.legal_gives() if not state.threats >> code & 1]
+            if not safe:
+                break
+            state.give(rng.choice(safe))
+            if bin(state.occupied).count('1') == placements:
+                return state
+            state.place(rng.choice(state.legal_placements()))
+
+
+def test_transform_count():
+    assert len(TRANSFORMS) == 12288
+
+
+def test_canonical_key_is_smallest_over_all_transforms():
+    rng = random.Random(1)
+    for placements, in_hand in ((0, True), (1, True), (3, True), (5, False), (7, True), (10, True)):
+        state = random_position(rng, placements, in_hand)
+        key, transform = canonicalize(state)
+        assert key == min(form_key(t.apply(state)) for t in TRANSFORMS)
+        assert form_key(transform.apply(state)) == key
+
+
+def test_symmetric_positions_share_a_key():
+    rng = random.Random(2)
+    for _ in range(50):
+        state = random_position(rng, rng.randrange(12))
+        key = canonicalize(state)[0]
+        for transform in rng.sample(TRANSFORMS, 20):
+            assert canonicalize(transform.apply(state))[0] == key
\ No newline at end of file
@@ -0,0 +1,48 @@
+import random
+
+from quarto.symmetry import Transform, canonical_key
+from quarto.tablebase import EndgameSolver, Tablebase, write_tablebase
+
+from test_search import move_value, random_endgames
+
+
+def test_write_and_probe_round_trip(tmp_path):
+    solver = EndgameSolver()
+    positions = random_endgames(20, 4, seed=1)
+    for state in positions:
+        solver.solve(state)
+    path = str(tmp_path / 'endgame.qtb')
+    write_tablebase(path, solver.results, 4)
+
+    table = Tablebase(path)
+    try:
+        assert table.entries == len(solver.results)
+        rng = random.Random(2)
+        for state in positions:
+            # Symmetric positions find the same entry, with the move mapped back
+            for transform in [Transform(0, 0, 0)] + [
+                    Transform(rng.randrange(32), rng.randrange(16), rng.randrange(24)) for _ in range(5)]:
+                position = transform.apply(state)
+                value, cell, code = table.probe(position)
+                assert table.covers(position)
+                assert value == solver.solve(position)[0]
+                assert move_value(solver, position, (cell, code)) == value
+    finally:
+        table.close()
+
+
+def test_probe_misses_positions_not_stored(tmp_path):
+    solver = EndgameSolver()
+    solver.solve(random_endgames(1, 3, seed=3)[0])
+    path = str(tmp_path / 'endgame.qtb')
+    write_tablebase(path, solver.results, 3)
+
+    table = Tablebase(path)
+    try:
+        for state in random_endgames(10, 3, seed=4) + random_endgames(5, 6, seed=5):
+            assert table.covers(state) == (canonical_key(state) in solver.results)
+        state = random_endgames(1, 3, seed=3)[0]
+        state.in_hand = None
+        assert table.probe(state) is None
+    finally:
+        table.close()
\ No newline at end of file